@@ -6,7 +6,7 @@ Loads control definitions from JSON files
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -36,29 +36,8 @@ class ControlLoader:
             Dictionary of controls indexed by control_id
         """
         # Load AWS controls
-        aws_dir = self.control_dir / 'aws'
-        if aws_dir.exists():
-            for json_file in aws_dir.glob('*.json'):
-                service = json_file.stem.replace('_controls', '')
-                
-                # Skip if not in requested services
-                if services and service not in services:
-                    continue
-                    
-                try:
-                    with open(json_file, 'r') as f:
-                        data = json.load(f)
-                        
-                    # Add controls to dictionary
-                    for control in data.get('controls', []):
-                        control_id = control['control_id']
-                        control['service'] = service
-                        self.controls[control_id] = control
-                        
-                    logger.info(f"Loaded {len(data.get('controls', []))} controls from {json_file.name}")
-                    
-                except Exception as e:
-                    logger.error(f"Error loading {json_file}: {str(e)}")
+        for control_id, control in self.iter_controls(services):
+            self.controls[control_id] = control
                     
         # Load standards mappings
         standards_dir = self.control_dir / 'standards'
@@ -75,6 +54,44 @@ class ControlLoader:
                     
         return self.controls
         
+    def iter_controls(self, services: List[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Iterate over control definitions as each file is read
+        
+        Unlike load_controls, nothing is retained on the loader and standards
+        mappings are not loaded, so callers that only walk the controls once
+        avoid holding the whole catalog in memory.
+        
+        Args:
+            services: List of services to load controls for (None = all)
+            
+        Yields:
+            (control_id, control) tuples
+        """
+        aws_dir = self.control_dir / 'aws'
+        if not aws_dir.exists():
+            return
+            
+        for json_file in aws_dir.glob('*.json'):
+            service = json_file.stem.replace('_controls', '')
+            
+            # Skip if not in requested services
+            if services and service not in services:
+                continue
+                
+            try:
+                with open(json_file, 'r') as f:
+                    data = json.load(f)
+                    
+                for control in data.get('controls', []):
+                    control['service'] = service
+                    yield control['control_id'], control
+                    
+                logger.info(f"Loaded {len(data.get('controls', []))} controls from {json_file.name}")
+                
+            except Exception as e:
+                logger.error(f"Error loading {json_file}: {str(e)}")
+                
     def get_controls_by_standard(self, standard: str, version: str = None) -> List[Dict[str, Any]]:
         """
         Get controls for a specific standard
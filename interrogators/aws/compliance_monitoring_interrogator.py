@@ -157,10 +157,11 @@ class ComplianceMonitoringInterrogator(BaseInterrogator):
         else:
             return ''
             
-    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any]) -> Optional[ViolationDetail]:
+    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any],
+                                  identity: tuple) -> Optional[ViolationDetail]:
         """Process CloudTrail event for monitoring violations"""
         event_name = event.get('eventName', '')
-        offender, account_id, offender_arn = self._extract_user_identity(event)
+        offender, account_id, offender_arn = identity
         
         # Only process if from external account
         if account_id in self.org_accounts:
@@ -343,12 +343,12 @@ class IAMPolicyInterrogator(BaseInterrogator):
         else:
             return ''
             
-    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any]) -> Optional[ViolationDetail]:
+    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any],
+                                  identity: tuple) -> Optional[ViolationDetail]:
         """Process CloudTrail event for IAM violations"""
         event_name = event.get('eventName', '')
         
-        # Extract user identity
-        offender, account_id, offender_arn = self._extract_user_identity(event)
+        offender, account_id, offender_arn = identity
         
         # Only process if from external account (not in org)
         if account_id in self.org_accounts:
@@ -214,12 +214,12 @@ class NetworkSecurityInterrogator(BaseInterrogator):
         else:
             return ''
             
-    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any]) -> Optional[ViolationDetail]:
+    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any],
+                                  identity: tuple) -> Optional[ViolationDetail]:
         """Process CloudTrail event for network violations"""
         event_name = event.get('eventName', '')
         
-        # Extract user identity
-        offender, account_id, offender_arn = self._extract_user_identity(event)
+        offender, account_id, offender_arn = identity
         
         # Build resource identifier
         request_params = event.get('requestParameters', {})
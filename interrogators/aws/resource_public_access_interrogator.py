@@ -449,10 +449,11 @@ class ResourcePublicAccessInterrogator(BaseInterrogator):
         else:
             return ''
             
-    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any]) -> Optional[ViolationDetail]:
+    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any],
+                                  identity: tuple) -> Optional[ViolationDetail]:
         """Process CloudTrail event"""
         event_name = event.get('eventName', '')
-        offender, account_id, offender_arn = self._extract_user_identity(event)
+        offender, account_id, offender_arn = identity
         
         request_params = event.get('requestParameters', {})
         resource_id = request_params.get('bucketName', request_params.get('snapshotId', 'Unknown'))
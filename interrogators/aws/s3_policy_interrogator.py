@@ -122,10 +122,11 @@ class S3PolicyInterrogator(BaseInterrogator):
         """Build CloudTrail filter"""
         return '{ $.eventName = PutBucketPolicy || $.eventName = DeleteBucketPolicy }'
         
-    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any]) -> Optional[ViolationDetail]:
+    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any],
+                                  identity: tuple) -> Optional[ViolationDetail]:
         """Process CloudTrail event"""
         event_name = event.get('eventName', '')
-        offender, account_id, offender_arn = self._extract_user_identity(event)
+        offender, account_id, offender_arn = identity
         
         request_params = event.get('requestParameters', {})
         bucket_name = request_params.get('bucketName', 'Unknown')
@@ -474,10 +474,11 @@ class ServiceConfigInterrogator(BaseInterrogator):
             # Generic filter for configuration changes
             return '{ $.eventName = Create* || $.eventName = Update* || $.eventName = Modify* }'
             
-    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any]) -> Optional[ViolationDetail]:
+    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any],
+                                  identity: tuple) -> Optional[ViolationDetail]:
         """Process CloudTrail event for service config violations"""
         event_name = event.get('eventName', '')
-        offender, account_id, offender_arn = self._extract_user_identity(event)
+        offender, account_id, offender_arn = identity
         
         # Only process if from external account
         if account_id in self.org_accounts:
@@ -4,17 +4,177 @@ All interrogators must inherit from this base class
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import boto3
 import json
 import logging
+import re
+import threading
+from collections import OrderedDict
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+# CloudTrail query windows are aligned to this boundary so repeated queries share cache entries
+CLOUDTRAIL_WINDOW_MS = 3600 * 1000
+
+# Maximum CloudTrail events processed per control check (v1.0)
+CLOUDTRAIL_EVENT_LIMIT = 100
+
+# One term of a CloudWatch Logs JSON filter, e.g. "$.eventName = Create*"
+_FILTER_TERM_RE = re.compile(r'^\$\.([\w.]+)\s*=\s*([^\s"*]+)(\*?)$')
+
+
+def _fetch_and_parse(logs_client, log_group: str, start_ms: int, end_ms: int,
+                     filter_pattern: str) -> tuple:
+    """Fetch CloudTrail events matching filter_pattern in a window and parse their messages"""
+    response = logs_client.filter_log_events(
+        logGroupName=log_group,
+        startTime=start_ms,
+        endTime=end_ms,
+        filterPattern=filter_pattern,
+        limit=CLOUDTRAIL_EVENT_LIMIT
+    )
+    
+    events = []
+    for event in response.get('events', []):
+        try:
+            events.append(_json_loads(event['message']))
+        except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses this
+            continue
+            
+    return tuple(events)
+
+
+def _compile_cloudtrail_filter(filter_pattern: str) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """
+    Translate a simple CloudWatch Logs JSON filter into a local predicate
+    
+    Supports patterns of the form '{ $.a.b = value || $.c = prefix* }' joined
+    entirely by '||' or entirely by '&&'. Anything else returns None so the
+    caller can fall back to server-side filtering.
+    """
+    body = filter_pattern.strip()
+    if not (body.startswith('{') and body.endswith('}')):
+        return None
+    body = body[1:-1].strip()
+    
+    if '||' in body and '&&' in body:
+        return None
+    combine = all if '&&' in body else any
+    
+    terms = []
+    for term in re.split(r'\s*(?:\|\||&&)\s*', body):
+        match = _FILTER_TERM_RE.match(term)
+        if not match:
+            return None
+        path, value, wildcard = match.groups()
+        terms.append((path.split('.'), value, bool(wildcard)))
+        
+    def matches(event: Dict[str, Any]) -> bool:
+        return combine(_filter_term_matches(event, *term) for term in terms)
+        
+    return matches
+
+
+def _filter_term_matches(event: Dict[str, Any], path: List[str], value: str, prefix: bool) -> bool:
+    """Evaluate a single compiled filter term against a parsed event"""
+    field = event
+    for key in path:
+        if not isinstance(field, dict):
+            return False
+        field = field.get(key)
+        
+    if not isinstance(field, str):
+        return False
+    return field.startswith(value) if prefix else field == value
+
+
+class CloudTrailEventCache:
+    """
+    Caches parsed CloudTrail events per (region, log group, window, filter pattern)
+    
+    Without a filter pattern an entry is one bulk page for local filtering;
+    with one it is the result of the server-side filtered query.
+    """
+    
+    def __init__(self, max_windows: int = 16):
+        """
+        Initialize event cache
+        
+        Args:
+            max_windows: Number of windows kept; the least recently used
+                window is dropped beyond that
+        """
+        self.max_windows = max_windows
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+        
+    def fetch(self, logs_client, region: str, log_group: str, start_ms: int, end_ms: int,
+              filter_pattern: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the parsed events for a window, all of them unless filter_pattern is given
+        
+        Every interrogator builds its own logs client, so windows are keyed
+        on the region rather than the client; logs_client only reads a
+        window that is not cached yet.
+        
+        Returns:
+            List of parsed events, or None if an unfiltered window spans more
+            than one page and must be left to server-side filtering
+        """
+        key = (region, log_group, start_ms, end_ms, filter_pattern)
+        with self._lock:
+            if key in self._windows:
+                self._windows.move_to_end(key)
+                return self._windows[key]
+                
+        if filter_pattern is None:
+            events = self._scan(logs_client, log_group, start_ms, end_ms)
+        else:
+            events = _fetch_and_parse(logs_client, log_group, start_ms, end_ms, filter_pattern)
+        
+        with self._lock:
+            self._windows[key] = events
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+        return events
+        
+    def _scan(self, logs_client, log_group: str, start_ms: int, end_ms: int) -> Optional[List[Dict[str, Any]]]:
+        """Read the window's first page; give up if there is more than one"""
+        response = logs_client.filter_log_events(
+            logGroupName=log_group,
+            startTime=start_ms,
+            endTime=end_ms
+        )
+        if response.get('nextToken'):
+            logger.info(f"CloudTrail window for {log_group} spans more than one page; "
+                        "using server-side filters")
+            return None
+            
+        events = []
+        for event in response.get('events', []):
+            try:
+                events.append(_json_loads(event['message']))
+            except json.JSONDecodeError:
+                continue
+        return events
+        
+    def clear(self):
+        """Drop all cached windows"""
+        with self._lock:
+            self._windows.clear()
+
 
-@dataclass
+@dataclass(slots=True)
 class ViolationDetail:
     """Details about a specific violation"""
     # WHO did it
@@ -52,7 +212,7 @@ class ViolationDetail:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class InterrogationResult:
     """Result of an interrogation"""
     control_id: str
@@ -73,6 +233,11 @@ class InterrogationResult:
 class BaseInterrogator(ABC):
     """Base class for all interrogators"""
     
+    # Shared by every interrogator so a window is read once per region
+    cloudtrail_cache = CloudTrailEventCache()
+    # Server-side filtered queries, shared the same way
+    cloudtrail_query_cache = CloudTrailEventCache(max_windows=256)
+    
     def __init__(self, aws_config: Dict[str, Any]):
         """
         Initialize interrogator with AWS configuration
@@ -84,7 +249,7 @@ class BaseInterrogator(ABC):
                 - cloudtrail_log_group: CloudTrail log group name
         """
         self.region = aws_config.get('region', 'us-east-1')
-        self.org_accounts = set(aws_config.get('account_ids', []))
+        self.org_accounts = frozenset(aws_config.get('account_ids', []))
         self.cloudtrail_log_group = aws_config.get('cloudtrail_log_group', 'CloudTrail')
         
         # Initialize AWS clients
@@ -141,27 +306,42 @@ class BaseInterrogator(ABC):
             
         try:
             # Search CloudTrail logs
-            end_time = datetime.utcnow()
-            start_time = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            start_time = start_time.replace(day=start_time.day - days_back)
+            # Window runs from midnight (UTC) days_back days ago until now
+            now = datetime.now(timezone.utc)
+            start_time = (now - timedelta(days=days_back)).replace(hour=0, minute=0, second=0, microsecond=0)
+            start_ms = int(start_time.timestamp() * 1000)
+            
+            # Round the end of the window up to the hour so repeated queries hit the cache
+            end_ms = int(now.timestamp() * 1000)
+            end_ms = -(-end_ms // CLOUDTRAIL_WINDOW_MS) * CLOUDTRAIL_WINDOW_MS
             
-            response = self.logs_client.filter_log_events(
-                logGroupName=self.cloudtrail_log_group,
-                startTime=int(start_time.timestamp() * 1000),
-                endTime=int(end_time.timestamp() * 1000),
-                filterPattern=filter_pattern,
-                limit=100  # Limit for v1.0
-            )
+            # Prefer filtering one shared bulk scan locally; fall back to a server-side query
+            events = None
+            predicate = self._cloudtrail_event_matches(control_config)
+            if predicate:
+                window = self.cloudtrail_cache.fetch(
+                    self.logs_client,
+                    self.region,
+                    self.cloudtrail_log_group,
+                    start_ms,
+                    end_ms
+                )
+                if window is not None:
+                    events = [event for event in window if predicate(event)][:CLOUDTRAIL_EVENT_LIMIT]
+                    
+            if events is None:
+                events = self.cloudtrail_query_cache.fetch(
+                    self.logs_client,
+                    self.region,
+                    self.cloudtrail_log_group,
+                    start_ms,
+                    end_ms,
+                    filter_pattern
+                )
             
-            # Process events
-            for event in response.get('events', []):
-                try:
-                    log_data = json.loads(event['message'])
-                    violation = self._process_cloudtrail_event(log_data, control_config)
-                    if violation:
-                        violations.append(violation)
-                except json.JSONDecodeError:
-                    continue
+            # Extract identities for the whole batch once, then let the interrogator filter it
+            parsed = [(event, self._extract_user_identity(event)) for event in events]
+            violations.extend(self._process_cloudtrail_events_batch(parsed, control_config))
                     
         except Exception as e:
             logger.error(f"Error searching CloudTrail: {str(e)}")
@@ -172,10 +352,47 @@ class BaseInterrogator(ABC):
         """Build CloudTrail filter pattern - override in subclasses"""
         return ""
         
-    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any]) -> Optional[ViolationDetail]:
-        """Process CloudTrail event - override in subclasses"""
+    def _cloudtrail_event_matches(self, control_config: Dict[str, Any]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+        """
+        Build a local predicate equivalent to the CloudTrail filter - override if needed
+        
+        Returns:
+            Callable taking a parsed event, or None to filter server-side
+        """
+        return _compile_cloudtrail_filter(self._build_cloudtrail_filter(control_config))
+        
+    def _process_cloudtrail_event(self, event: Dict[str, Any], control_config: Dict[str, Any],
+                                  identity: tuple) -> Optional[ViolationDetail]:
+        """
+        Process CloudTrail event - override in subclasses
+        
+        Args:
+            event: Parsed CloudTrail event
+            control_config: Control configuration
+            identity: (offender, account_id, offender_arn) already extracted
+                from the event by check_cloudtrail
+        """
         return None
         
+    def _process_cloudtrail_events_batch(self, parsed: List[tuple], control_config: Dict[str, Any]) -> List[ViolationDetail]:
+        """
+        Process a batch of CloudTrail events - override in subclasses
+        
+        Args:
+            parsed: List of (event, (offender, account_id, offender_arn)) tuples
+            control_config: Control configuration
+            
+        Returns:
+            List of violation details
+        """
+        # Default: defer to the per-event hook for backward compatibility
+        violations = []
+        for event, identity in parsed:
+            violation = self._process_cloudtrail_event(event, control_config, identity)
+            if violation:
+                violations.append(violation)
+        return violations
+        
     def _extract_user_identity(self, event: Dict[str, Any]) -> tuple:
         """Extract user identity from CloudTrail event"""
         user_identity = event.get('userIdentity', {})
@@ -10,11 +10,13 @@ sys.path.append(str(Path(__file__).parent))
 from framework.control_loader import ControlLoader
 
 loader = ControlLoader('./control_definitions')
-controls = loader.load_controls()
+# Sorting by ID holds every control in memory at once; iter_controls only
+# spares the loader's standards mappings and its id-indexed copy
+controls = sorted(loader.iter_controls(), key=lambda item: item[0])
 
 print(f"Available controls ({len(controls)} total):\n")
 
-for control_id, control in sorted(controls.items()):
+for control_id, control in controls:
     print(f"{control_id}: {control['title']}")
     print(f"  Service: {control.get('service', 'unknown')}")
     print(f"  Severity: {control['severity']}")
@@ -5,11 +5,18 @@ Finds controls across standards that check the same thing
 """
 
 import json
+import sys
 from pathlib import Path
 from typing import Dict, List, Set, Tuple,Any
 from collections import defaultdict
 import difflib
 
+if __package__ in (None, ''):
+    # Run as a script: make the mapping_engine package importable
+    sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from mapping_engine.json_io import write_json
+
 
 class ControlDeduplicator:
     """Analyze controls to find duplicates and conflicts"""
@@ -19,6 +26,7 @@ class ControlDeduplicator:
         self.all_controls = []
         self.duplicates = defaultdict(list)
         self.conflicts = []
+        self._duplicate_groups_cache = None
         
     def analyze_duplicates(self) -> Dict[str, Any]:
         """Main analysis entry point"""
@@ -26,7 +34,7 @@ class ControlDeduplicator:
         self._load_all_controls()
         
         # Find semantic duplicates
-        duplicate_groups = self._find_semantic_duplicates()
+        duplicate_groups = self._find_semantic_duplicates_cached()
         
         # Find parameter conflicts
         conflicts = self._find_conflicts(duplicate_groups)
@@ -38,65 +46,91 @@ class ControlDeduplicator:
         
     def _load_all_controls(self):
         """Load all control JSON files"""
+        self._duplicate_groups_cache = None
+        
         for json_file in self.control_dir.glob("*.json"):
             with open(json_file, 'r') as f:
                 data = json.load(f)
                 for control in data.get('controls', []):
                     control['source_file'] = json_file.name
+                    # Lowercase once here instead of on every pairwise comparison
+                    control['_title'] = control['title'].lower()
+                    control['_description'] = control['description'].lower()
+                    # Intern the low-cardinality strings repeated across every control
+                    control['severity'] = sys.intern(control['severity'])
+                    control['standards'] = {sys.intern(k): v for k, v in control['standards'].items()}
+                    control['interrogation']['class'] = sys.intern(control['interrogation']['class'])
+                    # Hoist the interrogation lookups out of the pairwise loop
+                    control['_cls'] = control['interrogation']['class']
+                    control['_params'] = control['interrogation'].get('parameters', {})
                     self.all_controls.append(control)
                     
+    def _find_semantic_duplicates_cached(self) -> Dict[str, List[Dict]]:
+        """Return duplicate groups, computing the O(N^2) scan only once per load"""
+        if self._duplicate_groups_cache is None:
+            self._duplicate_groups_cache = self._find_semantic_duplicates()
+        return self._duplicate_groups_cache
+        
     def _find_semantic_duplicates(self) -> Dict[str, List[Dict]]:
         """Find controls that check the same thing"""
-        duplicate_groups = defaultdict(list)
-        
-        # Group by similar titles
-        processed = set()
-        
-        for i, control1 in enumerate(self.all_controls):
-            if control1['control_id'] in processed:
-                continue
-                
-            group_key = f"group_{i}"
-            duplicate_groups[group_key].append(control1)
-            processed.add(control1['control_id'])
+        # Bucket by interrogation class: the class term carries 0.2 of the weight,
+        # so controls in different classes score at most 0.8 and can never match
+        buckets = defaultdict(list)
+        for i, control in enumerate(self.all_controls):
+            buckets[control['_cls']].append((i, control))
+        
+        # Union-find over control indexes so similarity is transitive (A~B, B~C groups A, B, C)
+        parent = list(range(len(self.all_controls)))
+        
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
             
-            # Find similar controls
-            for control2 in self.all_controls[i+1:]:
-                if control2['control_id'] in processed:
-                    continue
-                    
-                similarity = self._calculate_similarity(control1, control2)
-                if similarity > 0.85:  # 85% similar
-                    duplicate_groups[group_key].append(control2)
-                    processed.add(control2['control_id'])
+        def union(a: int, b: int):
+            # Keep the lowest index as root so group keys follow load order
+            parent[max(a, b)] = min(a, b)
+        
+        for bucket in buckets.values():
+            for pos, (i, control1) in enumerate(bucket):
+                for j, control2 in bucket[pos+1:]:
+                    root1, root2 = find(i), find(j)
+                    if root1 == root2:
+                        continue  # Already grouped through another control
+                        
+                    similarity = self._calculate_similarity(control1, control2)
+                    if similarity > 0.85:  # 85% similar
+                        union(root1, root2)
+                        
+        duplicate_groups = defaultdict(list)
+        for i, control in enumerate(self.all_controls):
+            duplicate_groups[find(i)].append(control)
                     
         # Filter out single-item groups
-        return {k: v for k, v in duplicate_groups.items() if len(v) > 1}
+        return {f"group_{root}": v for root, v in duplicate_groups.items() if len(v) > 1}
         
     def _calculate_similarity(self, control1: Dict, control2: Dict) -> float:
         """Calculate semantic similarity between two controls"""
         # Compare titles
         title_similarity = difflib.SequenceMatcher(
             None, 
-            control1['title'].lower(), 
-            control2['title'].lower()
+            control1['_title'], 
+            control2['_title']
         ).ratio()
         
         # Compare descriptions
         desc_similarity = difflib.SequenceMatcher(
             None,
-            control1['description'].lower(),
-            control2['description'].lower()
+            control1['_description'],
+            control2['_description']
         ).ratio()
         
         # Check if they have the same interrogation class
-        same_class = (control1['interrogation']['class'] == 
-                     control2['interrogation']['class'])
+        same_class = control1['_cls'] == control2['_cls']
         
         # Check if they have similar parameters
-        params1 = control1['interrogation'].get('parameters', {})
-        params2 = control2['interrogation'].get('parameters', {})
-        param_similarity = self._compare_parameters(params1, params2)
+        param_similarity = self._compare_parameters(control1['_params'], control2['_params'])
         
         # Weighted average
         weights = {
@@ -172,12 +206,14 @@ class ControlDeduplicator:
         """Check for conflicting parameters in similar controls"""
         conflicts = []
         
-        # Extract all numeric parameters
+        # Extract all numeric parameters, tracking distinct values as we go
         numeric_params = defaultdict(list)
+        distinct_values = defaultdict(set)
         
         for control in controls:
-            params = control['interrogation'].get('parameters', {})
+            params = control['_params']
             metadata = control.get('metadata', {})
+            standards = list(control['standards'].keys())
             
             # Check days parameters
             if 'days' in metadata:
@@ -185,8 +221,9 @@ class ControlDeduplicator:
                     numeric_params['days'].append({
                         'control': control['control_id'],
                         'value': days,
-                        'standards': list(control['standards'].keys())
+                        'standards': standards
                     })
+                    distinct_values['days'].add(days)
                     
             # Check numeric thresholds
             for key, value in params.items():
@@ -194,13 +231,13 @@ class ControlDeduplicator:
                     numeric_params[key].append({
                         'control': control['control_id'],
                         'value': value,
-                        'standards': list(control['standards'].keys())
+                        'standards': standards
                     })
+                    distinct_values[key].add(value)
                     
         # Find conflicts
         for param_name, values in numeric_params.items():
-            unique_values = set(v['value'] for v in values)
-            if len(unique_values) > 1:
+            if len(distinct_values[param_name]) > 1:
                 conflicts.append({
                     'parameter': param_name,
                     'values': values
@@ -280,7 +317,7 @@ class ControlDeduplicator:
         """Suggest which controls can share the same interrogator method"""
         consolidations = defaultdict(list)
         
-        for group_key, controls in self._find_semantic_duplicates().items():
+        for group_key, controls in self._find_semantic_duplicates_cached().items():
             # Group by interrogation pattern
             by_pattern = defaultdict(list)
             
@@ -309,8 +346,7 @@ if __name__ == "__main__":
     report = deduplicator.analyze_duplicates()
     
     # Save report
-    with open('deduplication_report.json', 'w') as f:
-        json.dump(report, f, indent=2)
+    write_json('deduplication_report.json', report)
         
     print(f"Deduplication Analysis Complete:")
     print(f"- Total controls: {report['summary']['total_controls']}")
@@ -5,7 +5,8 @@ Main interface for control analysis and mapping
 """
 
 import argparse
-import json
+import os
+import re
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -13,6 +14,7 @@ from datetime import datetime
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from mapping_engine.json_io import write_json
 from mapping_engine.processors.csv_processor_v2 import CSVProcessorV2
 from mapping_engine.analyzers.control_deduplicator import ControlDeduplicator
 from mapping_engine.mappers.interrogator_mapper import InterrogatorMapper
@@ -22,6 +24,9 @@ from mapping_engine.validators.coverage_validator import CoverageValidator
 class MappingEngineCLI:
     """Command line interface for mapping engine"""
     
+    # Standard name is the group that matched the CSV filename
+    _CSV_RE = re.compile(r'(?P<cis_v1_2>cis_v1_2)|(?P<cis_v1_4>cis_v1_4)|(?P<cis_v3_0>cis_v3_0)|(?P<fsbp>fsbp)')
+    
     def __init__(self):
         self.base_dir = Path(__file__).parent.parent
         self.csv_dir = self.base_dir.parent / 'cloud_control_framework' / 'SecPolicies'
@@ -79,17 +84,20 @@ class MappingEngineCLI:
         
         # Execute command
         if args.command == 'process':
-            self.process_csvs(args)
+            self.process_csvs(csv_dir=Path(args.csv_dir), output_dir=Path(args.output_dir))
         elif args.command == 'dedup':
-            self.analyze_duplicates(args)
+            self.analyze_duplicates(control_dir=Path(args.control_dir))
         elif args.command == 'map':
-            self.map_interrogators(args)
+            self.map_interrogators(control_dir=Path(args.control_dir),
+                                   interrogator_dir=Path(args.interrogator_dir),
+                                   fix=args.fix)
         elif args.command == 'validate':
-            self.validate_coverage(args)
+            self.validate_coverage(control_dir=Path(args.control_dir),
+                                   interrogator_dir=Path(args.interrogator_dir))
         elif args.command == 'analyze':
-            self.full_analysis(args)
+            self.full_analysis(fix=args.fix)
             
-    def process_csvs(self, args):
+    def process_csvs(self, *, csv_dir: Path, output_dir: Path):
         """Process CSV files with enhanced logic"""
         print("Processing CSV files with enhanced logic...")
         
@@ -97,21 +105,22 @@ class MappingEngineCLI:
         
         # Find CSV files
         csv_files = {}
-        csv_path = Path(args.csv_dir)
-        
-        for csv_file in csv_path.glob("*.csv"):
+        try:
+            with os.scandir(csv_dir) as it:
+                csv_entries = [entry for entry in it
+                               if entry.name.endswith('.csv') and not entry.name.startswith('.') and entry.is_file()]
+        except OSError:
+            # A missing directory holds no CSV files, as with glob
+            csv_entries = []
+            
+        for csv_file in csv_entries:
             # Extract standard name from filename
-            if 'cis_v1_2' in csv_file.name:
-                csv_files['cis_v1_2'] = str(csv_file)
-            elif 'cis_v1_4' in csv_file.name:
-                csv_files['cis_v1_4'] = str(csv_file)
-            elif 'cis_v3_0' in csv_file.name:
-                csv_files['cis_v3_0'] = str(csv_file)
-            elif 'fsbp' in csv_file.name:
-                csv_files['fsbp'] = str(csv_file)
+            match = self._CSV_RE.search(csv_file.name)
+            if match:
+                csv_files[match.lastgroup] = csv_file.path
                 
         if not csv_files:
-            print(f"No CSV files found in {args.csv_dir}")
+            print(f"No CSV files found in {csv_dir}")
             return
             
         # Process files
@@ -124,31 +133,25 @@ class MappingEngineCLI:
         print(f"- Services found: {len(stats['services_found'])}")
         
         # Save output
-        output_path = Path(args.output_dir) / 'enhanced'
-        processor.save_control_definitions(str(output_path))
+        output_path = output_dir / 'enhanced'
+        processor.save_control_definitions(output_path)
         
         # Save processing report
         report_file = self.output_dir / 'processing_report.json'
-        with open(report_file, 'w') as f:
-            # Convert sets to lists for JSON serialization
-            stats_serializable = stats.copy()
-            if 'services_found' in stats_serializable and isinstance(stats_serializable['services_found'], set):
-                stats_serializable['services_found'] = list(stats_serializable['services_found'])
-            
-            json.dump({
-                'timestamp': datetime.now().isoformat(),
-                'stats': stats_serializable,
-                'csv_files': csv_files,
-                'output_directory': str(output_path)
-            }, f, indent=2)
+        write_json(report_file, {
+            'timestamp': datetime.now().isoformat(),
+            'stats': stats,
+            'csv_files': csv_files,
+            'output_directory': str(output_path)
+        })
             
         print(f"\nReport saved to: {report_file}")
         
-    def analyze_duplicates(self, args):
+    def analyze_duplicates(self, *, control_dir: Path):
         """Analyze control duplicates"""
         print("Analyzing control duplicates...")
         
-        deduplicator = ControlDeduplicator(args.control_dir)
+        deduplicator = ControlDeduplicator(control_dir)
         report = deduplicator.analyze_duplicates()
         
         print(f"\nDuplication Analysis:")
@@ -166,8 +169,7 @@ class MappingEngineCLI:
                     
         # Save report
         report_file = self.output_dir / 'deduplication_report.json'
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        write_json(report_file, report)
             
         print(f"\nFull report saved to: {report_file}")
         
@@ -178,11 +180,11 @@ class MappingEngineCLI:
             for method, controls in list(consolidations.items())[:5]:
                 print(f"  {method}: {len(controls)} controls")
                 
-    def map_interrogators(self, args):
+    def map_interrogators(self, *, control_dir: Path, interrogator_dir: Path, fix: bool = False):
         """Map controls to interrogators"""
         print("Mapping controls to interrogators...")
         
-        mapper = InterrogatorMapper(args.control_dir, args.interrogator_dir)
+        mapper = InterrogatorMapper(control_dir, interrogator_dir)
         report = mapper.analyze_and_map()
         
         print(f"\nMapping Results:")
@@ -198,22 +200,21 @@ class MappingEngineCLI:
             
         # Save report
         report_file = self.output_dir / 'mapping_report.json'
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        write_json(report_file, report)
             
         print(f"\nFull report saved to: {report_file}")
         
         # Generate corrected files if requested
-        if args.fix and report['remapped_controls']:
+        if fix and report['remapped_controls']:
             print("\nGenerating corrected control files...")
             output_path = self.control_dir.parent / 'aws_corrected'
-            mapper.generate_corrected_controls(report, str(output_path))
+            mapper.generate_corrected_controls(report, output_path)
             
-    def validate_coverage(self, args):
+    def validate_coverage(self, *, control_dir: Path, interrogator_dir: Path):
         """Validate control coverage"""
         print("Validating control coverage...")
         
-        validator = CoverageValidator(args.control_dir, args.interrogator_dir)
+        validator = CoverageValidator(control_dir, interrogator_dir)
         report = validator.validate_coverage()
         
         print(f"\nValidation Results:")
@@ -236,18 +237,17 @@ class MappingEngineCLI:
                 
         # Save report
         report_file = self.output_dir / 'coverage_report.json'
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        write_json(report_file, report)
             
         print(f"\nFull report saved to: {report_file}")
         
         # Generate fix script if needed
         if report['invalid_controls']:
             fix_file = self.output_dir / 'coverage_fixes.py'
-            validator.generate_fix_script(report, str(fix_file))
+            validator.generate_fix_script(report, fix_file)
             print(f"Fix suggestions saved to: {fix_file}")
             
-    def full_analysis(self, args):
+    def full_analysis(self, *, fix: bool = False):
         """Run full analysis pipeline"""
         print("Running full analysis pipeline...\n")
         
@@ -255,39 +255,25 @@ class MappingEngineCLI:
         print("="*60)
         print("Step 1: Processing CSV files")
         print("="*60)
-        process_args = argparse.Namespace(
-            csv_dir=str(self.csv_dir),
-            output_dir=str(self.control_dir)
-        )
-        self.process_csvs(process_args)
+        self.process_csvs(csv_dir=self.csv_dir, output_dir=self.control_dir)
         
         # Step 2: Analyze duplicates
         print("\n" + "="*60)
         print("Step 2: Analyzing duplicates")
         print("="*60)
-        dedup_args = argparse.Namespace(control_dir=str(self.control_dir))
-        self.analyze_duplicates(dedup_args)
+        self.analyze_duplicates(control_dir=self.control_dir)
         
         # Step 3: Map interrogators
         print("\n" + "="*60)
         print("Step 3: Mapping interrogators")
         print("="*60)
-        map_args = argparse.Namespace(
-            control_dir=str(self.control_dir),
-            interrogator_dir=str(self.interrogator_dir),
-            fix=args.fix
-        )
-        self.map_interrogators(map_args)
+        self.map_interrogators(control_dir=self.control_dir, interrogator_dir=self.interrogator_dir, fix=fix)
         
         # Step 4: Validate coverage
         print("\n" + "="*60)
         print("Step 4: Validating coverage")
         print("="*60)
-        validate_args = argparse.Namespace(
-            control_dir=str(self.control_dir),
-            interrogator_dir=str(self.interrogator_dir)
-        )
-        self.validate_coverage(validate_args)
+        self.validate_coverage(control_dir=self.control_dir, interrogator_dir=self.interrogator_dir)
         
         # Summary
         print("\n" + "="*60)
@@ -305,12 +291,11 @@ class MappingEngineCLI:
                 'Coverage Validation'
             ],
             'output_directory': str(self.output_dir),
-            'fixes_applied': args.fix
+            'fixes_applied': fix
         }
         
         summary_file = self.output_dir / 'analysis_summary.json'
-        with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+        write_json(summary_file, summary)
             
         print(f"\nSummary saved to: {summary_file}")
 
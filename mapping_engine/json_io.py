@@ -0,0 +1,51 @@
+"""
+JSON helpers shared by the mapping engine
+Encode and decode with orjson when it is installed, the stdlib json module otherwise
+"""
+
+import json
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
+
+
+def _default(obj):
+    """Serialize sets (e.g. services_found) as lists and dataclasses as dicts"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def read_json(path) -> Any:
+    """Read and decode a JSON file"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_json(path, obj: Any, default: Optional[Callable] = None):
+    """Write obj to path as JSON indented with two spaces
+
+    Sets are written as lists and dataclasses as objects. A custom default
+    also receives datetimes and dataclasses, so orjson hands it the same
+    objects json.dump would.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+        if default is None:
+            default = _default
+        else:
+            option |= orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, default=default, option=option))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2, default=default or _default)
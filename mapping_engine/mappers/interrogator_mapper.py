@@ -4,14 +4,177 @@ Interrogator Mapper
 Maps controls to existing interrogators and identifies gaps
 """
 
-import json
 import ast
+import os
+import sys
+from bisect import bisect_right
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional,Any
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from dataclasses import dataclass, field
 import inspect
 import importlib.util
 
+if __package__ in (None, ''):
+    # Run as a script: make the mapping_engine package importable
+    sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from mapping_engine.json_io import read_json, write_json
+
+# Bump whenever the information extracted from interrogator sources changes
+_AST_CACHE_VERSION = 3
+
+# Parsed interrogator info is cached with the engine's output, not next to
+# the interrogator sources
+_AST_CACHE_PATH = Path(__file__).parent.parent / 'output' / '.interrogator_ast_cache.json'
+
+
+def _search_text(control: Dict) -> str:
+    """Lowercased title and description that keyword matching runs against"""
+    return f"{control['title'].lower()}\n{control.get('description', '').lower()}"
+
+
+def _iter_json_files(directory: Path) -> List[str]:
+    """List the JSON files in a directory with a single scandir pass
+    
+    A missing directory yields nothing, as with Path.glob.
+    """
+    try:
+        with os.scandir(directory) as it:
+            return [entry.path for entry in it
+                    if entry.name.endswith('.json') and not entry.name.startswith('.') and entry.is_file()]
+    except OSError:
+        return []
+
+
+def _read_json_files(paths: List[str]) -> List[Any]:
+    """Read several JSON files concurrently, preserving order"""
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+        return list(executor.map(read_json, paths))
+
+
+@dataclass(frozen=True, slots=True)
+class InterrogatorPattern:
+    """Keywords that point a control at an interrogator and one of its check types"""
+    name: str
+    keywords: Tuple[str, ...]
+    check_types: Tuple[Tuple[str, Tuple[str, ...]], ...]
+    # Highest check_type score this interrogator can add to its keyword score
+    max_check_score: int = field(init=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'max_check_score', max(len(kws) for _, kws in self.check_types))
+
+
+# Pattern matching for interrogator selection
+PATTERNS = (
+    InterrogatorPattern(
+        'IAMPolicyInterrogator',
+        ('password', 'mfa', 'access key', 'credentials', 'iam'),
+        (
+            ('password_length', ('length', 'minimum', 'characters')),
+            ('password_reuse', ('reuse', 'prevent')),
+            ('password_expiry', ('expir', 'days', 'max')),
+            ('mfa_enabled', ('mfa', 'multi-factor')),
+            ('access_key_rotation', ('rotation', 'rotate', '90 days')),
+            ('root_access_keys', ('root', 'access key'))
+        )
+    ),
+    InterrogatorPattern(
+        'NetworkSecurityInterrogator',
+        ('security group', 'nacl', 'network', 'ingress', 'egress'),
+        (
+            ('ingress_rules', ('ingress', '0.0.0.0/0', 'port')),
+            ('default_sg_rules', ('default', 'security group')),
+            ('nacl_rules', ('nacl', 'network acl'))
+        )
+    ),
+    InterrogatorPattern(
+        'ResourcePublicAccessInterrogator',
+        ('public', 'internet', 'accessible', '0.0.0.0/0'),
+        (
+            ('public_access', ('public', 'accessible')),
+            ('s3_public', ('s3', 'bucket', 'public')),
+            ('snapshot_public', ('snapshot', 'public')),
+            ('rds_public', ('rds', 'database', 'public'))
+        )
+    )
+)
+
+# Every distinct keyword across interrogators and check types
+_PATTERN_KEYWORDS = frozenset(
+    sys.intern(kw)
+    for pattern in PATTERNS
+    for kw in (*pattern.keywords, *(kw for _, kws in pattern.check_types for kw in kws))
+)
+
+
+class MappingStatus(IntEnum):
+    """Outcome of mapping a single control"""
+    MAPPED = 0
+    UNMAPPED = 1
+    REMAPPED = 2
+    NEEDS_NEW_METHOD = 3
+
+
+class _InterrogatorVisitor(ast.NodeVisitor):
+    """Collects classes, their methods and check types in a single pass"""
+    
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        self.classes = {}
+        self._info = None
+        self._execute_check_types = None
+        self._in_execute = False
+        
+    def visit_ClassDef(self, node: ast.ClassDef):
+        outer = (self._info, self._execute_check_types)
+        self._info = {
+            'file': self.file_name,
+            'methods': [],
+            'check_types': [],
+            'capabilities': []
+        }
+        self._execute_check_types = []
+        
+        # Only methods (and nested classes) matter; skip assignments, docstrings etc.
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.ClassDef)):
+                self.visit(item)
+                
+        # check_type values handled in execute follow the _check_* methods
+        self._info['check_types'].extend(self._execute_check_types)
+        self.classes[node.name] = self._info
+        self._info, self._execute_check_types = outer
+        
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        if self._in_execute:
+            # Nested helpers inside execute may still compare check_type
+            self.generic_visit(node)
+            return
+            
+        if node.name.startswith('_check_'):
+            self._info['check_types'].append(node.name.replace('_check_', ''))
+        self._info['methods'].append(node.name)
+        
+        # Look for check_type handling in execute method
+        if node.name == 'execute':
+            self._in_execute = True
+            self.generic_visit(node)
+            self._in_execute = False
+            
+    def visit_Compare(self, node: ast.Compare):
+        # Look for: if check_type == 'some_value':
+        if (self._in_execute and isinstance(node.left, ast.Name) and node.left.id == 'check_type' and
+                isinstance(node.comparators[0], ast.Constant) and
+                isinstance(node.comparators[0].value, str)):
+            self._execute_check_types.append(node.comparators[0].value)
+        self.generic_visit(node)
+
 
 class InterrogatorMapper:
     """Maps controls to interrogators intelligently"""
@@ -19,6 +182,7 @@ class InterrogatorMapper:
     def __init__(self, control_dir: str, interrogator_dir: str):
         self.control_dir = Path(control_dir)
         self.interrogator_dir = Path(interrogator_dir)
+        self._cache_path = _AST_CACHE_PATH
         self.available_interrogators = {}
         self.control_mappings = {}
         self.unmapped_controls = []
@@ -41,72 +205,90 @@ class InterrogatorMapper:
         
     def _discover_interrogators(self):
         """Scan interrogator directory to understand capabilities"""
+        cache = self._load_ast_cache()
+        fresh_cache = {}
+        
+        # Reuse the parsed info for files unchanged since the last run
+        entries = []
+        stale = []
         for py_file in self.interrogator_dir.glob("*.py"):
             if py_file.name.startswith('__'):
                 continue
                 
-            try:
-                # Parse the Python file to extract class and method info
-                with open(py_file, 'r') as f:
-                    tree = ast.parse(f.read())
-                    
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.ClassDef):
-                        # Found an interrogator class
-                        interrogator_info = {
-                            'file': py_file.name,
-                            'methods': [],
-                            'check_types': [],
-                            'capabilities': []
-                        }
-                        
-                        # Extract methods and check types
-                        for item in node.body:
-                            if isinstance(item, ast.FunctionDef):
-                                if item.name.startswith('_check_'):
-                                    check_type = item.name.replace('_check_', '')
-                                    interrogator_info['check_types'].append(check_type)
-                                    
-                                interrogator_info['methods'].append(item.name)
-                                
-                        # Look for check_type handling in execute method
-                        for item in node.body:
-                            if isinstance(item, ast.FunctionDef) and item.name == 'execute':
-                                check_types = self._extract_check_types_from_execute(item)
-                                interrogator_info['check_types'].extend(check_types)
-                                
-                        self.available_interrogators[node.name] = interrogator_info
+            stat = py_file.stat()
+            cached = cache.get(py_file.name)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                entries.append((py_file, stat, cached[2]))
+            else:
+                entries.append((py_file, stat, None))
+                stale.append(py_file)
+                
+        # Read changed sources on worker threads while this thread parses them
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            sources = {py_file: executor.submit(py_file.read_bytes) for py_file in stale}
+            
+            for py_file, stat, classes in entries:
+                if classes is None:
+                    try:
+                        classes = self._parse_interrogator_file(py_file, sources[py_file].result())
+                    except Exception as e:
+                        print(f"Error parsing {py_file}: {e}")
+                        continue
                         
-            except Exception as e:
-                print(f"Error parsing {py_file}: {e}")
+                fresh_cache[py_file.name] = (stat.st_mtime_ns, stat.st_size, classes)
+                self.available_interrogators.update(classes)
                 
-    def _extract_check_types_from_execute(self, func_node: ast.FunctionDef) -> List[str]:
-        """Extract check_type values from execute method"""
-        check_types = []
-        
-        for node in ast.walk(func_node):
-            # Look for: if check_type == 'some_value':
-            if isinstance(node, ast.Compare):
-                if (isinstance(node.left, ast.Name) and node.left.id == 'check_type' and
-                    isinstance(node.comparators[0], ast.Str)):
-                    check_types.append(node.comparators[0].s)
-            # Python 3.8+ uses ast.Constant instead of ast.Str
-            elif isinstance(node, ast.Compare):
-                if (isinstance(node.left, ast.Name) and node.left.id == 'check_type' and
-                    isinstance(node.comparators[0], ast.Constant) and 
-                    isinstance(node.comparators[0].value, str)):
-                    check_types.append(node.comparators[0].value)
-                    
-        return check_types
+        if fresh_cache != cache:
+            self._save_ast_cache(fresh_cache)
+            
+    def _parse_interrogator_file(self, py_file: Path, source: Optional[bytes] = None) -> Dict[str, Dict]:
+        """Parse an interrogator file and extract class and method info"""
+        if source is None:
+            source = py_file.read_bytes()
+            
+        # Parsing the bytes lets the compiler decode the source itself
+        tree = ast.parse(source, filename=str(py_file))
+            
+        visitor = _InterrogatorVisitor(py_file.name)
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                visitor.visit(node)
+                
+        return visitor.classes
+        
+    def _load_ast_cache(self) -> Dict[str, tuple]:
+        """Load cached interrogator info for this interrogator directory, keyed by file name"""
+        try:
+            cache = read_json(self._cache_path)
+            if (cache.get('version') != _AST_CACHE_VERSION or
+                    cache.get('interrogator_dir') != str(self.interrogator_dir.resolve())):
+                return {}
+            return {name: (mtime_ns, size, classes)
+                    for name, (mtime_ns, size, classes) in cache['files'].items()}
+        except Exception:
+            return {}
         
+    def _save_ast_cache(self, files: Dict[str, tuple]):
+        """Persist interrogator info so unchanged files are not re-parsed"""
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            write_json(self._cache_path, {
+                'version': _AST_CACHE_VERSION,
+                'interrogator_dir': str(self.interrogator_dir.resolve()),
+                'files': files
+            })
+        except OSError as e:
+            print(f"Could not write interrogator cache {self._cache_path}: {e}")
+            
     def _load_controls(self) -> List[Dict]:
         """Load all control definitions"""
         controls = []
         
-        for json_file in self.control_dir.glob("*.json"):
-            with open(json_file, 'r') as f:
-                data = json.load(f)
-                controls.extend(data.get('controls', []))
+        for data in _read_json_files(_iter_json_files(self.control_dir)):
+            for control in data.get('controls', []):
+                # Lowercase once; keyword matching scans this text
+                control['_search_text'] = _search_text(control)
+                controls.append(control)
                 
         return controls
         
@@ -119,43 +301,54 @@ class InterrogatorMapper:
             'new_methods_needed': defaultdict(list)
         }
         
-        for control in controls:
-            mapping = self._map_single_control(control)
+        # Keyword-scan every control that will need a suggestion in one batch.
+        # The same control repeated across standards has identical text, so
+        # each distinct text is scanned once and its keywords shared.
+        pending = {}
+        for i, control in enumerate(controls):
+            if control['interrogation']['class'] not in self.available_interrogators:
+                pending[i] = control.get('_search_text') or _search_text(control)
+        unique_texts = list(dict.fromkeys(pending.values()))
+        found_by_text = dict(zip(unique_texts, self._find_keywords_batch(unique_texts)))
+        found_keywords = {i: found_by_text[text] for i, text in pending.items()}
+        
+        # Indexed by MappingStatus; NEEDS_NEW_METHOD is grouped by interrogator instead
+        buckets = (results['mapped'], results['unmapped'], results['remapped'])
+        new_methods_needed = results['new_methods_needed']
+        
+        for i, control in enumerate(controls):
+            status, mapping = self._map_single_control(control, found_keywords.get(i))
             
-            if mapping['status'] == 'mapped':
-                results['mapped'].append(mapping)
-            elif mapping['status'] == 'unmapped':
-                results['unmapped'].append(mapping)
-            elif mapping['status'] == 'remapped':
-                results['remapped'].append(mapping)
-            elif mapping['status'] == 'needs_new_method':
-                interrogator = mapping['suggested_interrogator']
-                results['new_methods_needed'][interrogator].append(mapping)
+            if status is MappingStatus.NEEDS_NEW_METHOD:
+                new_methods_needed[mapping['suggested_interrogator']].append(mapping)
+            else:
+                buckets[status].append(mapping)
                 
         return results
         
-    def _map_single_control(self, control: Dict) -> Dict[str, Any]:
+    def _map_single_control(self, control: Dict, found: Optional[Set[str]] = None) -> Tuple[MappingStatus, Dict[str, Any]]:
         """Map a single control to interrogator"""
-        current_interrogator = control['interrogation']['class']
-        current_check_type = control['interrogation']['parameters'].get('check_type', '')
+        interrogation = control['interrogation']
+        control_id = control['control_id']
+        current_interrogator = interrogation['class']
+        current_check_type = interrogation['parameters'].get('check_type', '')
         
         # Check if current mapping is valid
-        if current_interrogator in self.available_interrogators:
-            interrogator_info = self.available_interrogators[current_interrogator]
-            
+        interrogator_info = self.available_interrogators.get(current_interrogator)
+        if interrogator_info is not None:
             # Check if the check_type is supported
             if not current_check_type or current_check_type in interrogator_info['check_types']:
-                return {
+                return MappingStatus.MAPPED, {
                     'status': 'mapped',
-                    'control_id': control['control_id'],
+                    'control_id': control_id,
                     'interrogator': current_interrogator,
                     'check_type': current_check_type
                 }
             else:
                 # Interrogator exists but doesn't support this check_type
-                return {
+                return MappingStatus.NEEDS_NEW_METHOD, {
                     'status': 'needs_new_method',
-                    'control_id': control['control_id'],
+                    'control_id': control_id,
                     'current_interrogator': current_interrogator,
                     'suggested_interrogator': current_interrogator,
                     'needed_check_type': current_check_type,
@@ -163,86 +356,84 @@ class InterrogatorMapper:
                 }
         
         # Try to find a better mapping
-        suggested = self._suggest_interrogator(control)
+        suggested = self._suggest_interrogator(control, found)
         
         if suggested:
-            return {
+            return MappingStatus.REMAPPED, {
                 'status': 'remapped',
-                'control_id': control['control_id'],
+                'control_id': control_id,
                 'old_interrogator': current_interrogator,
                 'new_interrogator': suggested['interrogator'],
                 'new_check_type': suggested['check_type'],
                 'reason': suggested['reason']
             }
         else:
-            return {
+            return MappingStatus.UNMAPPED, {
                 'status': 'unmapped',
-                'control_id': control['control_id'],
+                'control_id': control_id,
                 'title': control['title'],
                 'current_interrogator': current_interrogator,
                 'reason': 'No suitable interrogator found'
             }
             
-    def _suggest_interrogator(self, control: Dict) -> Optional[Dict[str, str]]:
+    def _find_keywords_batch(self, texts: List[str]) -> List[Set[str]]:
+        """Find pattern keywords in many search texts with one corpus scan per keyword"""
+        found = [set() for _ in texts]
+        if not texts:
+            return found
+            
+        # Start offset of each text in the joined corpus
+        starts = []
+        pos = 0
+        for text in texts:
+            starts.append(pos)
+            pos += len(text) + 1
+        starts.append(pos)
+        corpus = '\x1f'.join(texts)
+        
+        for kw in _PATTERN_KEYWORDS:
+            i = corpus.find(kw)
+            while i != -1:
+                idx = bisect_right(starts, i) - 1
+                found[idx].add(kw)
+                # One hit per text is enough; resume at the next text
+                i = corpus.find(kw, starts[idx + 1])
+                
+        return found
+        
+    def _suggest_interrogator(self, control: Dict, found: Optional[Set[str]] = None) -> Optional[Dict[str, str]]:
         """Suggest best interrogator for a control"""
-        title = control['title'].lower()
-        desc = control.get('description', '').lower()
         metadata = control.get('metadata', {})
         
-        # Pattern matching for interrogator selection
-        patterns = {
-            'IAMPolicyInterrogator': {
-                'keywords': ['password', 'mfa', 'access key', 'credentials', 'iam'],
-                'check_types': {
-                    'password_length': ['length', 'minimum', 'characters'],
-                    'password_reuse': ['reuse', 'prevent'],
-                    'password_expiry': ['expir', 'days', 'max'],
-                    'mfa_enabled': ['mfa', 'multi-factor'],
-                    'access_key_rotation': ['rotation', 'rotate', '90 days'],
-                    'root_access_keys': ['root', 'access key']
-                }
-            },
-            'NetworkSecurityInterrogator': {
-                'keywords': ['security group', 'nacl', 'network', 'ingress', 'egress'],
-                'check_types': {
-                    'ingress_rules': ['ingress', '0.0.0.0/0', 'port'],
-                    'default_sg_rules': ['default', 'security group'],
-                    'nacl_rules': ['nacl', 'network acl']
-                }
-            },
-            'ResourcePublicAccessInterrogator': {
-                'keywords': ['public', 'internet', 'accessible', '0.0.0.0/0'],
-                'check_types': {
-                    'public_access': ['public', 'accessible'],
-                    's3_public': ['s3', 'bucket', 'public'],
-                    'snapshot_public': ['snapshot', 'public'],
-                    'rds_public': ['rds', 'database', 'public']
-                }
-            }
-        }
+        if found is None:
+            found = self._find_keywords_batch([control.get('_search_text') or _search_text(control)])[0]
         
         best_match = None
         best_score = 0
         
-        for interrogator, pattern_info in patterns.items():
+        for pattern in PATTERNS:
+            interrogator = pattern.name
             if interrogator not in self.available_interrogators:
                 continue
                 
             # Check if any keywords match
-            keyword_score = sum(1 for kw in pattern_info['keywords'] if kw in title or kw in desc)
+            keyword_score = sum(1 for kw in pattern.keywords if kw in found)
             
-            if keyword_score > best_score:
-                # Find best check_type
-                for check_type, check_keywords in pattern_info['check_types'].items():
-                    check_score = sum(1 for kw in check_keywords if kw in title or kw in desc)
-                    
-                    if check_score > 0:
-                        best_match = {
-                            'interrogator': interrogator,
-                            'check_type': check_type,
-                            'reason': f"Matched keywords: {', '.join(kw for kw in check_keywords if kw in title or kw in desc)}"
-                        }
-                        best_score = keyword_score + check_score
+            # Skip when even a full check_type match could not beat the best so far
+            if not keyword_score or keyword_score + pattern.max_check_score <= best_score:
+                continue
+                
+            # Find best check_type
+            for check_type, check_keywords in pattern.check_types:
+                check_score = sum(1 for kw in check_keywords if kw in found)
+                
+                if check_score > 0 and keyword_score + check_score > best_score:
+                    best_match = {
+                        'interrogator': interrogator,
+                        'check_type': check_type,
+                        'reason': f"Matched keywords: {', '.join(kw for kw in check_keywords if kw in found)}"
+                    }
+                    best_score = keyword_score + check_score
                         
         return best_match
         
@@ -286,33 +477,35 @@ class InterrogatorMapper:
         
         # Load original controls by file
         controls_by_file = defaultdict(list)
+        remap_by_id = {r['control_id']: r for r in mapping_report['remapped_controls']}
         
-        for json_file in self.control_dir.glob("*.json"):
-            with open(json_file, 'r') as f:
-                data = json.load(f)
-                service = data.get('service', 'unknown')
+        for data in _read_json_files(_iter_json_files(self.control_dir)):
+            service = data.get('service', 'unknown')
+            
+            # Apply remappings
+            for control in data.get('controls', []):
+                control_id = control['control_id']
                 
-                # Apply remappings
-                for control in data.get('controls', []):
-                    control_id = control['control_id']
-                    
-                    # Check if this control was remapped
-                    for remapping in mapping_report['remapped_controls']:
-                        if remapping['control_id'] == control_id:
-                            control['interrogation']['class'] = remapping['new_interrogator']
-                            control['interrogation']['parameters']['check_type'] = remapping['new_check_type']
-                            control['mapping_notes'] = f"Remapped: {remapping['reason']}"
-                            
-                    controls_by_file[service].append(control)
+                # Check if this control was remapped
+                remapping = remap_by_id.get(control_id)
+                if remapping is not None:
+                    control['interrogation']['class'] = remapping['new_interrogator']
+                    control['interrogation']['parameters']['check_type'] = remapping['new_check_type']
+                    control['mapping_notes'] = f"Remapped: {remapping['reason']}"
+                        
+                controls_by_file[service].append(control)
                     
-        # Save corrected files
-        for service, controls in controls_by_file.items():
-            output_file = output_path / f"{service}_controls.json"
-            with open(output_file, 'w') as f:
-                json.dump({
-                    'service': service,
-                    'controls': controls
-                }, f, indent=2)
+        # Save corrected files, one writer thread per service file
+        def write_service(item):
+            service, controls = item
+            write_json(output_path / f"{service}_controls.json", {
+                'service': service,
+                'controls': controls
+            })
+            
+        if controls_by_file:
+            with ThreadPoolExecutor(max_workers=min(16, len(controls_by_file))) as executor:
+                list(executor.map(write_service, controls_by_file.items()))
                 
         print(f"Generated corrected control files in {output_path}")
 
@@ -327,8 +520,7 @@ if __name__ == "__main__":
     report = mapper.analyze_and_map()
     
     # Save report
-    with open('mapping_report.json', 'w') as f:
-        json.dump(report, f, indent=2)
+    write_json(Path('mapping_report.json'), report)
         
     print(f"Interrogator Mapping Analysis:")
     print(f"- Mapped controls: {report['summary']['mapped_controls']}")
@@ -5,88 +5,151 @@ Smarter control processing with accurate service detection and metadata extracti
 """
 
 import csv
-import json
+import functools
 import re
+import sys
+import types
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Any
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 import hashlib
 
+if __package__ in (None, ''):
+    # Run as a script: make the mapping_engine package importable
+    sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from mapping_engine.json_io import write_json
+
+# Metadata extraction patterns, compiled once. _META_RE finds every number
+# or CIDR block in a single scan, tagging a preceding "port(s)" and a
+# following "day(s)".
+_NUM_RE = re.compile(r'(\d+)')
+_META_RE = re.compile(
+    r'(?P<port>port[s]?\s+)?'
+    r'(?:(?P<cidr>\d+\.\d+\.\d+\.\d+/\d+|::/\d+)|(?P<num>\d+))'
+    r'(?P<day>\s*days?)?',
+    re.I
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _content_hash(title: str, description: str) -> str:
+    """Six hex digits identifying a control's content.
+
+    The same title and description recur across CIS versions, so repeats are
+    served from the cache. Only the first three digest bytes are hex-encoded;
+    the IDs match earlier runs.
+    """
+    content = f"{title}:{description}"
+    return hashlib.md5(content.encode(), usedforsecurity=False).digest()[:3].hex().upper()
+
+
+@dataclass(slots=True)
+class Control:
+    """A deduplicated control; converted to a dict only when saved"""
+    control_id: str
+    title: str
+    description: str
+    severity: str
+    metadata: Dict[str, Any]
+    interrogation: Dict[str, Any]
+    standards: Dict[str, Dict[str, str]]
+
 
 class CSVProcessorV2:
     """Enhanced CSV processor with intelligent parsing"""
     
+    # Specific service indicators for the keyword fallback, in priority order
+    SERVICE_INDICATORS = (
+        ('iam', ('password', 'mfa', 'access key', 'credentials', 'identity', 'role', 'policy', 'permission')),
+        ('ec2', ('instance', 'security group', 'vpc', 'subnet', 'network acl', 'elastic ip')),
+        ('s3', ('bucket', 'object', 's3')),
+        ('rds', ('database', 'db instance', 'db cluster', 'aurora')),
+        ('kms', ('encryption key', 'cmk', 'customer master key')),
+        ('cloudtrail', ('trail', 'cloudtrail', 'api calls')),
+        ('cloudfront', ('distribution', 'cdn', 'cloudfront')),
+        ('lambda', ('function', 'serverless', 'lambda')),
+        ('dynamodb', ('table', 'dynamodb')),
+        ('ecs', ('container', 'task', 'ecs', 'fargate')),
+        ('eks', ('kubernetes', 'eks', 'node group'))
+    )
+    
+    # Service mapping based on control ID prefix. Iteration order is the
+    # priority order for the text fallback and control keys.
+    SERVICE_PREFIX_MAP = types.MappingProxyType({
+        'IAM': 'iam',
+        'EC2': 'ec2',
+        'S3': 's3',
+        'RDS': 'rds',
+        'KMS': 'kms',
+        'CLOUDTRAIL': 'cloudtrail',
+        'CLOUDFRONT': 'cloudfront',
+        'ELB': 'elb',
+        'LAMBDA': 'lambda',
+        'VPC': 'ec2',  # VPC controls go to EC2
+        'EBS': 'ec2',  # EBS controls go to EC2
+        'DYNAMODB': 'dynamodb',
+        'SNS': 'sns',
+        'SQS': 'sqs',
+        'CONFIG': 'config',
+        'CLOUDWATCH': 'cloudwatch',
+        'ACM': 'acm',
+        'APIGATEWAY': 'apigateway',
+        'APPSYNC': 'appsync',
+        'ATHENA': 'athena',
+        'AUTOSCALING': 'autoscaling',
+        'BACKUP': 'backup',
+        'CODEBUILD': 'codebuild',
+        'COGNITO': 'cognito',
+        'DMS': 'dms',
+        'DOCUMENTDB': 'documentdb',
+        'EFS': 'efs',
+        'EKS': 'eks',
+        'ECS': 'ecs',
+        'EMR': 'emr',
+        'GLUE': 'glue',
+        'GUARDDUTY': 'guardduty',
+        'KINESIS': 'kinesis',
+        'MSK': 'msk',
+        'NEPTUNE': 'neptune',
+        'OPENSEARCH': 'opensearch',
+        'REDSHIFT': 'redshift',
+        'ROUTE53': 'route53',
+        'SAGEMAKER': 'sagemaker',
+        'SECRETSMANAGER': 'secretsmanager',
+        'STEPFUNCTIONS': 'stepfunctions',
+        'WAF': 'waf',
+        'WORKSPACES': 'workspaces',
+        # Additional services from the "other" bucket
+        'ELASTICSEARCH': 'elasticsearch',
+        'ES': 'elasticsearch',
+        'ELASTICACHE': 'elasticache',
+        'ELASTICBEANSTALK': 'elasticbeanstalk',
+        'INSPECTOR': 'inspector',
+        'MQ': 'mq',
+        'MACIE': 'macie',
+        'NETWORKFIREWALL': 'networkfirewall',
+        'PCA': 'pca',
+        'PRIVATECA': 'pca',
+        'SSM': 'ssm',
+        'SERVICECATALOG': 'servicecatalog',
+        'TRANSFER': 'transfer',
+        'FIREHOSE': 'firehose',
+        'DATAFIREHOSE': 'firehose',
+        'DATASYNC': 'datasync',
+        'CONNECT': 'connect',
+        'ACCOUNT': 'account',
+        'MONITORING': 'monitoring'
+    })
+    _PREFIX_SET = frozenset(SERVICE_PREFIX_MAP)
+    
     def __init__(self):
         self.controls_by_service = defaultdict(list)
         self.unique_controls = {}
-        self.control_origins = defaultdict(list)  # Track which standards have which controls
-        
-        # Service mapping based on control ID prefix
-        self.service_prefix_map = {
-            'IAM': 'iam',
-            'EC2': 'ec2',
-            'S3': 's3',
-            'RDS': 'rds',
-            'KMS': 'kms',
-            'CLOUDTRAIL': 'cloudtrail',
-            'CLOUDFRONT': 'cloudfront',
-            'ELB': 'elb',
-            'LAMBDA': 'lambda',
-            'VPC': 'ec2',  # VPC controls go to EC2
-            'EBS': 'ec2',  # EBS controls go to EC2
-            'DYNAMODB': 'dynamodb',
-            'SNS': 'sns',
-            'SQS': 'sqs',
-            'CONFIG': 'config',
-            'CLOUDWATCH': 'cloudwatch',
-            'ACM': 'acm',
-            'APIGATEWAY': 'apigateway',
-            'APPSYNC': 'appsync',
-            'ATHENA': 'athena',
-            'AUTOSCALING': 'autoscaling',
-            'BACKUP': 'backup',
-            'CODEBUILD': 'codebuild',
-            'COGNITO': 'cognito',
-            'DMS': 'dms',
-            'DOCUMENTDB': 'documentdb',
-            'EFS': 'efs',
-            'EKS': 'eks',
-            'ECS': 'ecs',
-            'EMR': 'emr',
-            'GLUE': 'glue',
-            'GUARDDUTY': 'guardduty',
-            'KINESIS': 'kinesis',
-            'MSK': 'msk',
-            'NEPTUNE': 'neptune',
-            'OPENSEARCH': 'opensearch',
-            'REDSHIFT': 'redshift',
-            'ROUTE53': 'route53',
-            'SAGEMAKER': 'sagemaker',
-            'SECRETSMANAGER': 'secretsmanager',
-            'STEPFUNCTIONS': 'stepfunctions',
-            'WAF': 'waf',
-            'WORKSPACES': 'workspaces',
-            # Additional services from the "other" bucket
-            'ELASTICSEARCH': 'elasticsearch',
-            'ES': 'elasticsearch',
-            'ELASTICACHE': 'elasticache',
-            'ELASTICBEANSTALK': 'elasticbeanstalk',
-            'INSPECTOR': 'inspector',
-            'MQ': 'mq',
-            'MACIE': 'macie',
-            'NETWORKFIREWALL': 'networkfirewall',
-            'PCA': 'pca',
-            'PRIVATECA': 'pca',
-            'SSM': 'ssm',
-            'SERVICECATALOG': 'servicecatalog',
-            'TRANSFER': 'transfer',
-            'FIREHOSE': 'firehose',
-            'DATAFIREHOSE': 'firehose',
-            'DATASYNC': 'datasync',
-            'CONNECT': 'connect',
-            'ACCOUNT': 'account',
-            'MONITORING': 'monitoring'
-        }
+        self.control_origins = defaultdict(list)  # control key -> [(standard, original_id)]
+        self._interrogation_pool = {}  # shared interrogation dicts, see _create_interrogation
         
     def process_csv_files(self, csv_files: Dict[str, str]) -> Dict[str, Any]:
         """Process multiple CSV files with enhanced logic"""
@@ -97,9 +160,10 @@ class CSVProcessorV2:
             'duplicates_found': 0
         }
         
+        # Files are processed in order so later standards only record their
+        # mapping for controls an earlier file already produced
         for standard, filepath in csv_files.items():
-            controls_in_file = self._process_single_csv(filepath, standard)
-            stats['total_controls'] += controls_in_file
+            stats['total_controls'] += self._process_single_csv(filepath, standard)
             
         stats['unique_controls'] = len(self.unique_controls)
         stats['services_found'] = set(self.controls_by_service.keys())
@@ -109,60 +173,82 @@ class CSVProcessorV2:
         
     def _process_single_csv(self, filepath: str, standard: str) -> int:
         """Process a single CSV file"""
-        count = 0
+        standard = sys.intern(standard)
+        processed = 0
+        # Tokenize with the C reader straight from the file and zip against
+        # the header captured once, rather than going through DictReader's
+        # per-row Python code
         with open(filepath, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                self._process_control(row, standard)
-                count += 1
-        return count
-        
-    def _process_control(self, row: Dict[str, str], standard: str):
-        """Process individual control with enhanced logic"""
-        control_id = row['ControlId']
-        title = row['Title']
-        
-        # Normalize Control Tower IDs (CT.RDS.PR.23 -> CT_RDS_PR_23)
-        if control_id.startswith('CT.'):
-            control_id = control_id.replace('.', '_')
-        
-        # Generate unique key based on control content
-        control_key = self._generate_control_key(title, row['Description'])
-        
-        # Track where this control came from
-        self.control_origins[control_key].append({
-            'standard': standard,
-            'original_id': control_id
-        })
-        
-        # If we've seen this control before, just add the standard mapping
-        if control_key in self.unique_controls:
-            existing = self.unique_controls[control_key]
-            existing['standards'][standard] = {
-                'control_id': control_id,
-                'severity': row['SeverityRating']
-            }
-        else:
-            # Create new control with enhanced processing
-            control = {
-                'control_id': control_key,
-                'title': title,
-                'description': row['Description'],
-                'severity': row['SeverityRating'],
-                'metadata': self._extract_metadata(row),
-                'interrogation': self._determine_interrogation(row),
-                'standards': {
-                    standard: {
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return processed
+                
+            # Key each row from its raw Title and Description columns before
+            # building a row dict. A control that is already held only needs
+            # its standard mapping, so its metadata and interrogation are
+            # never recomputed.
+            id_at, title_at, desc_at, severity_at = (
+                header.index(column) for column in ('ControlId', 'Title', 'Description', 'SeverityRating')
+            )
+            for values in reader:
+                if not values:
+                    continue
+                processed += 1
+                control_key = self._generate_control_key(values[title_at], values[desc_at])
+                control_id = self._normalize_control_id(values[id_at])
+                
+                # Track where this control came from as (standard, original_id)
+                self.control_origins[control_key].append((standard, control_id))
+                
+                # If we've seen this control before, just add the standard mapping
+                existing = self.unique_controls.get(control_key)
+                if existing is not None:
+                    existing.standards[standard] = {
                         'control_id': control_id,
-                        'severity': row['SeverityRating']
+                        'severity': sys.intern(values[severity_at])
                     }
+                else:
+                    control, service = self._parse_control(dict(zip(header, values)), standard, control_key, control_id)
+                    self.unique_controls[control_key] = control
+                    self.controls_by_service[service].append(control)
+        return processed
+        
+    @staticmethod
+    def _normalize_control_id(control_id: str) -> str:
+        """Normalize Control Tower IDs (CT.RDS.PR.23 -> CT_RDS_PR_23)"""
+        if control_id.startswith('CT.'):
+            return control_id.replace('.', '_')
+        return control_id
+        
+    def _parse_control(self, row: Dict[str, str], standard: str, control_key: str,
+                       control_id: str) -> Tuple[Control, str]:
+        """Build a new control and determine the service it belongs to"""
+        title = row['Title']
+        # Only a handful of severities exist; share one string per value
+        severity = sys.intern(row['SeverityRating'])
+        
+        # Create new control with enhanced processing; the lowercased
+        # title and description are shared by all interrogation helpers
+        metadata = self._extract_metadata(row)
+        title_lc = title.lower()
+        desc_lc = row['Description'].lower()
+        control = Control(
+            control_id=control_key,
+            title=title,
+            description=row['Description'],
+            severity=severity,
+            metadata=metadata,
+            interrogation=self._determine_interrogation(row, metadata, title_lc, desc_lc),
+            standards={
+                standard: {
+                    'control_id': control_id,
+                    'severity': severity
                 }
             }
-            
-            self.unique_controls[control_key] = control
-            service = self._determine_service_smart(row)
-            self.controls_by_service[service].append(control)
-            
+        )
+        return control, self._determine_service_smart(row)
+        
     def _determine_service_smart(self, control: Dict[str, str]) -> str:
         """Determine service using control ID prefix for 99.99% accuracy"""
         control_id = control['ControlId'].upper()
@@ -173,18 +259,20 @@ class CSVProcessorV2:
             prefix = control_id.split('.')[0]
             # Remove any leading text before the service name
             # e.g., "CIS.1.12" -> check if "CIS" is a service
-            if prefix in self.service_prefix_map:
-                return self.service_prefix_map[prefix]
+            if prefix in self._PREFIX_SET:
+                return self.SERVICE_PREFIX_MAP[prefix]
             
             # Handle prefixed IDs like "AWS-IAM.1" or "CIS-EC2.1"
             parts = prefix.split('-')
             for part in parts:
-                if part in self.service_prefix_map:
-                    return self.service_prefix_map[part]
-        
-        # Fallback: scan title and description for service indicators
-        text = (control['Title'] + ' ' + control['Description']).upper()
-        for prefix, service in self.service_prefix_map.items():
+                if part in self._PREFIX_SET:
+                    return self.SERVICE_PREFIX_MAP[part]
+        
+        # Fallback: scan title and description for service indicators. The
+        # first prefix in map order wins, not the leftmost one in the text,
+        # and plain substring checks stop at that first hit.
+        text = f"{control['Title']} {control['Description']}".upper()
+        for prefix, service in self.SERVICE_PREFIX_MAP.items():
             if prefix in text:
                 return service
                 
@@ -193,26 +281,11 @@ class CSVProcessorV2:
         
     def _fallback_service_detection(self, control: Dict[str, str]) -> str:
         """Fallback service detection using keywords"""
-        title = control['Title'].lower()
-        desc = control['Description'].lower()
+        # Keywords never contain a newline, so one scan covers both fields
+        text = f"{control['Title']}\n{control['Description']}".lower()
         
-        # Specific service indicators
-        service_indicators = {
-            'iam': ['password', 'mfa', 'access key', 'credentials', 'identity', 'role', 'policy', 'permission'],
-            'ec2': ['instance', 'security group', 'vpc', 'subnet', 'network acl', 'elastic ip'],
-            's3': ['bucket', 'object', 's3'],
-            'rds': ['database', 'db instance', 'db cluster', 'aurora'],
-            'kms': ['encryption key', 'cmk', 'customer master key'],
-            'cloudtrail': ['trail', 'cloudtrail', 'api calls'],
-            'cloudfront': ['distribution', 'cdn', 'cloudfront'],
-            'lambda': ['function', 'serverless', 'lambda'],
-            'dynamodb': ['table', 'dynamodb'],
-            'ecs': ['container', 'task', 'ecs', 'fargate'],
-            'eks': ['kubernetes', 'eks', 'node group']
-        }
-        
-        for service, keywords in service_indicators.items():
-            if any(keyword in title or keyword in desc for keyword in keywords):
+        for service, keywords in self.SERVICE_INDICATORS:
+            if any(keyword in text for keyword in keywords):
                 return service
                 
         return 'other'
@@ -222,23 +295,41 @@ class CSVProcessorV2:
         metadata = {}
         text = control['Title'] + ' ' + control['Description']
         
+        # One pass collects ports, days, numbers and CIDR blocks. A number may be
+        # a port and a day count at once, and a CIDR's numbers still count as
+        # numeric values, as they did with separate scans.
+        ports, days, numbers, cidrs = [], [], [], []
+        for match in _META_RE.finditer(text):
+            cidr = match.group('cidr')
+            if cidr:
+                cidrs.append(cidr)
+                values = [int(n) for n in _NUM_RE.findall(cidr)]
+                numbers.extend(values)
+                if match.group('port') and cidr[0] != ':':
+                    ports.append(values[0])
+                if match.group('day'):
+                    days.append(values[-1])
+            else:
+                number = int(match.group('num'))
+                numbers.append(number)
+                if match.group('port'):
+                    ports.append(number)
+                if match.group('day'):
+                    days.append(number)
+                    
         # Extract ports
-        ports = re.findall(r'port[s]?\s+(\d+)', text, re.I)
         if ports:
-            metadata['ports'] = [int(p) for p in ports]
+            metadata['ports'] = ports
             
         # Extract time periods (days)
-        days = re.findall(r'(\d+)\s*days?', text, re.I)
         if days:
-            metadata['days'] = [int(d) for d in days]
+            metadata['days'] = days
             
-        # Extract numeric thresholds
-        numbers = re.findall(r'(\d+)', text)
+        # Extract numeric thresholds, deduplicated in order of appearance
         if numbers:
-            metadata['numeric_values'] = list(set(int(n) for n in numbers))
+            metadata['numeric_values'] = list(dict.fromkeys(numbers))
             
         # Extract CIDR blocks
-        cidrs = re.findall(r'\d+\.\d+\.\d+\.\d+/\d+|::/\d+', text)
         if cidrs:
             metadata['cidr_blocks'] = cidrs
             
@@ -248,18 +339,22 @@ class CSVProcessorV2:
             'bucket', 'instance', 'database', 'function', 'key', 'trail',
             'distribution', 'cluster', 'snapshot', 'volume', 'table'
         ]
+        text_lc = text.lower()
         for resource in resource_keywords:
-            if resource in text.lower():
+            if resource in text_lc:
                 resources.append(resource)
         if resources:
             metadata['resources'] = resources
             
         return metadata
         
-    def _determine_interrogation(self, control: Dict[str, str]) -> Dict[str, Any]:
+    def _determine_interrogation(self, control: Dict[str, str], metadata: Dict[str, Any] = None,
+                                 title_lc: str = None, desc_lc: str = None) -> Dict[str, Any]:
         """Enhanced interrogation determination with better accuracy"""
-        title = control['Title'].lower()
-        desc = control['Description'].lower()
+        if metadata is None:
+            metadata = self._extract_metadata(control)
+        title = title_lc if title_lc is not None else control['Title'].lower()
+        desc = desc_lc if desc_lc is not None else control['Description'].lower()
         control_id = control['ControlId'].upper()
         
         # Password-specific patterns
@@ -284,51 +379,55 @@ class CSVProcessorV2:
         if 'access key' in title and ('rotat' in title or 'days' in title):
             return self._create_interrogation('IAMPolicyInterrogator', 'access_key_rotation')
             
-        # Public access patterns
-        if any(term in title or term in desc for term in ['public', '0.0.0.0/0', 'internet', 'publicly accessible']):
-            return self._determine_public_access_interrogation(control)
-            
-        # Encryption patterns
-        if any(term in title or term in desc for term in ['encrypt', 'kms', 'tls', 'ssl', 'https']):
-            return self._determine_encryption_interrogation(control)
-            
-        # Logging patterns
-        if any(term in title or term in desc for term in ['log', 'trail', 'audit']):
-            return self._determine_logging_interrogation(control)
-            
-        # Network security
-        if any(term in title or term in desc for term in ['security group', 'nacl', 'network acl']):
-            return self._determine_network_interrogation(control)
-            
+        # Public access, encryption, logging and network patterns, checked in
+        # priority order against the title and description in one string
+        text = f"{title}\n{desc}"
+        for terms, handler in self.INTERROGATION_DISPATCH:
+            if any(term in text for term in terms):
+                return handler(self, control, metadata, title)
+                
         # Default fallback
         return self._create_interrogation('ServiceConfigInterrogator', 'general')
         
     def _create_interrogation(self, class_name: str, check_type: str, params: Dict = None) -> Dict[str, Any]:
-        """Create interrogation configuration"""
-        base = {
-            'class': class_name,
-            'method': 'execute',
-            'parameters': {'check_type': check_type}
-        }
-        if params:
-            base['parameters'].update(params)
+        """Create interrogation configuration
+        
+        Identical configurations are pooled and the same dict is returned for
+        each of them, so callers must treat the result as read-only.
+        """
+        key = (class_name, check_type, tuple(
+            (name, tuple(value) if isinstance(value, list) else value)
+            for name, value in params.items()
+        ) if params else ())
+        base = self._interrogation_pool.get(key)
+        if base is None:
+            base = {
+                'class': class_name,
+                'method': 'execute',
+                'parameters': {'check_type': check_type}
+            }
+            if params:
+                # List values come from the first control's metadata; copy
+                # them so the pooled entry never aliases one control's lists
+                base['parameters'].update(
+                    (name, list(value) if isinstance(value, list) else value)
+                    for name, value in params.items()
+                )
+            self._interrogation_pool[key] = base
         return base
         
-    def _determine_public_access_interrogation(self, control: Dict[str, str]) -> Dict[str, Any]:
+    def _determine_public_access_interrogation(self, control: Dict[str, str], metadata: Dict[str, Any], title_lc: str) -> Dict[str, Any]:
         """Determine public access interrogation details"""
-        title = control['Title'].lower()
-        metadata = self._extract_metadata(control)
-        
         params = {'check_type': 'public_access'}
         
         # Determine resource type
-        if 's3' in title or 'bucket' in title:
+        if 's3' in title_lc or 'bucket' in title_lc:
             params['resource_type'] = 'S3Bucket'
-        elif 'snapshot' in title:
+        elif 'snapshot' in title_lc:
             params['resource_type'] = 'EBSSnapshot'
-        elif 'rds' in title:
+        elif 'rds' in title_lc:
             params['resource_type'] = 'RDSInstance'
-        elif 'security group' in title:
+        elif 'security group' in title_lc:
             params['resource_type'] = 'SecurityGroup'
             params['check_type'] = 'ingress_rules'
             if metadata.get('ports'):
@@ -336,43 +435,36 @@ class CSVProcessorV2:
                 
         return self._create_interrogation('ResourcePublicAccessInterrogator', 'public_access', params)
         
-    def _determine_encryption_interrogation(self, control: Dict[str, str]) -> Dict[str, Any]:
+    def _determine_encryption_interrogation(self, control: Dict[str, str], metadata: Dict[str, Any], title_lc: str) -> Dict[str, Any]:
         """Determine encryption interrogation details"""
-        title = control['Title'].lower()
-        
         params = {}
-        if 'at rest' in title or 'at-rest' in title:
+        if 'at rest' in title_lc or 'at-rest' in title_lc:
             params['encryption_type'] = 'at_rest'
-        elif 'in transit' in title or 'tls' in title or 'https' in title:
+        elif 'in transit' in title_lc or 'tls' in title_lc or 'https' in title_lc:
             params['encryption_type'] = 'in_transit'
             
         return self._create_interrogation('EncryptionConfigInterrogator', 'encryption', params)
         
-    def _determine_logging_interrogation(self, control: Dict[str, str]) -> Dict[str, Any]:
+    def _determine_logging_interrogation(self, control: Dict[str, str], metadata: Dict[str, Any], title_lc: str) -> Dict[str, Any]:
         """Determine logging interrogation details"""
-        title = control['Title'].lower()
-        
         params = {}
-        if 'cloudtrail' in title:
+        if 'cloudtrail' in title_lc:
             params['service'] = 'cloudtrail'
-            if 'multi-region' in title or 'all regions' in title:
+            if 'multi-region' in title_lc or 'all regions' in title_lc:
                 params['check_type'] = 'multi_region'
-            elif 'validation' in title:
+            elif 'validation' in title_lc:
                 params['check_type'] = 'log_validation'
-        elif 'vpc flow' in title:
+        elif 'vpc flow' in title_lc:
             params['service'] = 'vpc_flow_logs'
             
         return self._create_interrogation('LoggingConfigInterrogator', 'logging', params)
         
-    def _determine_network_interrogation(self, control: Dict[str, str]) -> Dict[str, Any]:
+    def _determine_network_interrogation(self, control: Dict[str, str], metadata: Dict[str, Any], title_lc: str) -> Dict[str, Any]:
         """Determine network interrogation details"""
-        title = control['Title'].lower()
-        metadata = self._extract_metadata(control)
-        
         params = {}
-        if 'default security group' in title:
+        if 'default security group' in title_lc:
             params['check_type'] = 'default_sg_rules'
-        elif 'nacl' in title or 'network acl' in title:
+        elif 'nacl' in title_lc or 'network acl' in title_lc:
             params['check_type'] = 'nacl_rules'
             
         if metadata.get('ports'):
@@ -382,42 +474,60 @@ class CSVProcessorV2:
             
         return self._create_interrogation('NetworkSecurityInterrogator', 'network', params)
         
+    # Keyword categories for _determine_interrogation, in priority order. Every
+    # handler takes (control, metadata, title_lc).
+    INTERROGATION_DISPATCH = (
+        (('public', '0.0.0.0/0', 'internet', 'publicly accessible'), _determine_public_access_interrogation),
+        (('encrypt', 'kms', 'tls', 'ssl', 'https'), _determine_encryption_interrogation),
+        (('log', 'trail', 'audit'), _determine_logging_interrogation),
+        (('security group', 'nacl', 'network acl'), _determine_network_interrogation)
+    )
+    
     def _generate_control_key(self, title: str, description: str) -> str:
         """Generate unique control ID based on content"""
         # Extract service indicator
         service = 'AWS'
-        for prefix in self.service_prefix_map:
+        for prefix in self.SERVICE_PREFIX_MAP:
             if prefix in title.upper():
                 service = prefix
                 break
                 
         # Create hash from title + description for uniqueness
-        content = f"{title}:{description}"
-        hash_val = hashlib.md5(content.encode()).hexdigest()[:6].upper()
-        
-        return f"{service}_{hash_val}"
+        return f"{service}_{_content_hash(title, description)}"
         
     def save_control_definitions(self, output_dir: str):
         """Save control definitions with enhanced structure"""
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        # Save controls by service
-        for service, controls in self.controls_by_service.items():
-            if controls:
-                filename = output_path / f"{service}_controls.json"
-                with open(filename, 'w') as f:
-                    json.dump({
-                        'service': service,
-                        'control_count': len(controls),
-                        'controls': controls
-                    }, f, indent=2)
-                print(f"Saved {len(controls)} controls to {filename}")
+        # Save controls by service. Files are written here rather than as rows
+        # arrive: a later standard can still add its mapping to a control that
+        # was already seen, and control_count leads each file. The files are
+        # independent, so they are written on worker threads to overlap the
+        # open/write/close syscalls.
+        payloads = {
+            output_path / f"{service}_controls.json": {
+                'service': service,
+                'control_count': len(controls),
+                'controls': controls
+            }
+            for service, controls in self.controls_by_service.items()
+            if controls
+        }
+        if payloads:
+            with ThreadPoolExecutor(max_workers=min(16, len(payloads))) as executor:
+                list(executor.map(write_json, payloads, payloads.values()))
+                
+        for filename, payload in payloads.items():
+            print(f"Saved {payload['control_count']} controls to {filename}")
                 
         # Save control origins for traceability
         origins_file = output_path / 'control_origins.json'
-        with open(origins_file, 'w') as f:
-            json.dump(dict(self.control_origins), f, indent=2)
+        write_json(origins_file, {
+            control_key: [{'standard': standard, 'original_id': original_id}
+                          for standard, original_id in origins]
+            for control_key, origins in self.control_origins.items()
+        })
         print(f"Saved control origins to {origins_file}")
 
 
@@ -4,14 +4,169 @@ Coverage Validator
 Ensures every control has a working interrogator mapping
 """
 
-import json
+import os
+import re
 import sys
+import types
 from pathlib import Path
-from typing import Dict, List, Set, Tuple,Any
+from typing import Callable, DefaultDict, Dict, FrozenSet, Iterator, List, Mapping, Optional, Set, Tuple, Any
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 
-# Add parent directories to path for imports
-sys.path.append(str(Path(__file__).parent.parent.parent))
+if __package__ in (None, ''):
+    # Run as a script: make the mapping_engine package importable
+    sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+
+from mapping_engine.json_io import read_json, write_json
+
+# Static discovery pattern, compiled once and reused for every interrogator
+# file. One scan finds the interrogator class, check_type comparisons and
+# _check_* methods; the named group that matched says which. It runs over the
+# raw file bytes, so only the matched names are ever decoded.
+_DISCOVERY_RE = re.compile(
+    rb'class\s+(?P<cls>\w+)\s*\(.*BaseInterrogator'
+    rb'|check_type\s*==\s*[\'"](?P<ct>[^\'"]+)[\'"]'
+    rb'|def\s+_check_(?P<mth>\w+)\s*\('
+)
+
+# Reasons recorded for invalid controls. The interrogator and check type
+# involved are stored alongside, so the reasons are fixed, interned keys.
+_REASON_NO_INTERROGATION, _REASON_NO_CLASS, _REASON_INTERROGATOR_MISSING, _REASON_CHECK_TYPE_MISSING = map(
+    sys.intern,
+    ('missing_interrogation', 'no_interrogator_class', 'interrogator_not_found', 'check_type_not_found')
+)
+
+# Shared read-only stand-in for a missing interrogation, parameters or metadata
+_EMPTY = types.MappingProxyType({})
+
+# Parameter rules by interrogator class name, see _param_rules
+_PARAM_RULES: Dict[str, Tuple[Callable, ...]] = {}
+
+# Dynamic discovery results per interrogator directory, kept for the life of
+# the process: (interrogators, warnings raised while discovering them)
+_DISCOVERY_CACHE: Dict[Tuple, Tuple[Dict[str, Set[str]], List[Dict]]] = {}
+
+
+def _read_bytes(path: str) -> bytes:
+    """Read a whole file as bytes"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _scan_dir(directory: Path, suffix: str) -> List[os.DirEntry]:
+    """List the files in directory ending in suffix with a single scandir pass
+    
+    Hidden files are skipped and a missing directory yields nothing, as
+    with Path.glob.
+    """
+    try:
+        with os.scandir(directory) as it:
+            return [entry for entry in it
+                    if entry.name.endswith(suffix) and not entry.name.startswith('.') and entry.is_file()]
+    except OSError:
+        return []
+
+
+def _source_signature(directory: Path) -> Tuple:
+    """Name, mtime and size of each Python source in directory, one stat per file"""
+    signature = []
+    for entry in _scan_dir(directory, '.py'):
+        stat = entry.stat()
+        signature.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def _load_controls(path: str) -> Any:
+    """Load the controls array of one control file
+    
+    Returns the exception instead of raising it. The rest of the document
+    is dropped here so only the controls outlive the worker call.
+    """
+    try:
+        return read_json(path).get('controls', [])
+    except Exception as e:
+        return e
+
+
+def _iter_fixes(invalid_controls: List[Dict[str, Any]]) -> Iterator[str]:
+    """Yield the fix suggestions for invalid controls, separated by blank lines"""
+    separator = ''
+    for invalid in invalid_controls:
+        control_id = invalid['control_id']
+        reason = invalid['reason']
+        
+        # The report may have been reloaded from JSON, so compare by value
+        if reason == _REASON_INTERROGATOR_MISSING:
+            yield (f"{separator}# Control {control_id} needs interrogator: {invalid.get('interrogator', 'Unknown')}\n"
+                   f"# Consider mapping to an existing interrogator or creating a new one\n")
+        elif reason == _REASON_CHECK_TYPE_MISSING:
+            yield (f"{separator}# Control {control_id} needs method '{invalid['check_type']}' in {invalid['interrogator']}\n"
+                   f"# Available methods: {', '.join(invalid.get('available_check_types', []))}\n")
+        else:
+            continue
+        separator = '\n'
+
+
+def _require_resource_type(control: Dict[str, Any], params: Mapping[str, Any],
+                           check_type: str) -> Optional[Dict[str, str]]:
+    """Public access checks need to know which resource type to inspect"""
+    if 'resource_type' not in params:
+        return {
+            'control_id': control['control_id'],
+            'type': 'missing_parameter',
+            'parameter': 'resource_type',
+            'severity': 'medium'
+        }
+    return None
+
+
+def _require_ports_for_ingress(control: Dict[str, Any], params: Mapping[str, Any],
+                               check_type: str) -> Optional[Dict[str, str]]:
+    """Ingress rule checks need ports from their parameters or metadata"""
+    if check_type == 'ingress_rules':
+        if 'ports' not in params and 'port' not in (control.get('metadata') or _EMPTY):
+            return {
+                'control_id': control['control_id'],
+                'type': 'missing_parameter',
+                'parameter': 'ports',
+                'severity': 'low'
+            }
+    return None
+
+
+def _param_rules(interrogator_class: str) -> Tuple[Callable, ...]:
+    """Parameter rules for an interrogator class, worked out once per name"""
+    rules = _PARAM_RULES.get(interrogator_class)
+    if rules is None:
+        rules = []
+        if 'Public' in interrogator_class:
+            rules.append(_require_resource_type)
+        if 'Network' in interrogator_class:
+            rules.append(_require_ports_for_ingress)
+        rules = _PARAM_RULES[interrogator_class] = tuple(rules)
+    return rules
+
+
+@dataclass(slots=True)
+class ValidationResults:
+    """Outcome of validating a set of controls
+    
+    Valid controls only feed the counts and usage figures, so they are held
+    as parallel columns instead of a dict per control. Invalid controls and
+    warnings appear record by record in the report and stay as dicts.
+    """
+    valid_control_ids: List[str] = field(default_factory=list)
+    valid_interrogators: List[str] = field(default_factory=list)
+    valid_check_types: List[str] = field(default_factory=list)
+    invalid: List[Dict[str, Any]] = field(default_factory=list)
+    warnings: List[Dict[str, Any]] = field(default_factory=list)
+    
+    def add_valid(self, control_id: str, interrogator: str, check_type: str):
+        """Record a control whose interrogation checked out"""
+        self.valid_control_ids.append(control_id)
+        self.valid_interrogators.append(interrogator)
+        self.valid_check_types.append(check_type)
 
 
 class CoverageValidator:
@@ -20,11 +175,7 @@ class CoverageValidator:
     def __init__(self, control_dir: str, interrogator_dir: str):
         self.control_dir = Path(control_dir)
         self.interrogator_dir = Path(interrogator_dir)
-        self.validation_results = {
-            'valid': [],
-            'invalid': [],
-            'warnings': []
-        }
+        self.validation_results = ValidationResults()
         
     def validate_coverage(self) -> Dict[str, Any]:
         """Main validation process"""
@@ -34,9 +185,10 @@ class CoverageValidator:
         # 2. Discover available interrogators
         available_interrogators = self._discover_interrogators()
         
-        # 3. Validate each control
+        # 3. Validate each control against frozen check type sets
+        check_types = {name: frozenset(methods) for name, methods in available_interrogators.items()}
         for control in controls:
-            self._validate_control(control, available_interrogators)
+            self._validate_control(control, check_types)
             
         # 4. Generate validation report
         report = self._generate_report(controls, available_interrogators)
@@ -47,24 +199,49 @@ class CoverageValidator:
         """Load all control definitions"""
         controls = []
         
-        for json_file in self.control_dir.glob("*.json"):
+        json_files = _scan_dir(self.control_dir, '.json')
+        if not json_files:
+            return controls
+            
+        # Read and parse the files on worker threads; results are merged here
+        # in listing order so the shared lists are only touched by this thread
+        with ThreadPoolExecutor(max_workers=min(32, len(json_files))) as executor:
+            loaded = list(executor.map(_load_controls, [json_file.path for json_file in json_files]))
+            
+        for json_file, file_controls in zip(json_files, loaded):
             try:
-                with open(json_file, 'r') as f:
-                    data = json.load(f)
-                    for control in data.get('controls', []):
-                        control['source_file'] = json_file.name
-                        controls.append(control)
+                if isinstance(file_controls, Exception):
+                    raise file_controls
+                for control in file_controls:
+                    control['source_file'] = json_file.name
+                    controls.append(control)
             except Exception as e:
-                self.validation_results['warnings'].append({
+                self.validation_results.warnings.append({
                     'type': 'file_error',
-                    'file': str(json_file),
+                    'file': json_file.path,
                     'error': str(e)
                 })
                 
         return controls
         
     def _discover_interrogators(self) -> Dict[str, Set[str]]:
-        """Discover available interrogators and their methods"""
+        """Discover available interrogators and their methods
+        
+        Results are shared between validators; callers must not modify them.
+        """
+        # Reuse an earlier discovery while no interrogator source, nor any
+        # module of the parent package they inherit _check_* methods from,
+        # has been added, removed or modified since
+        key = (str(self.interrogator_dir),
+               _source_signature(self.interrogator_dir),
+               _source_signature(self.interrogator_dir.parent))
+        cached = _DISCOVERY_CACHE.get(key)
+        if cached is not None:
+            interrogators, warnings = cached
+            self.validation_results.warnings.extend(warnings)
+            return interrogators
+            
+        first_warning = len(self.validation_results.warnings)
         interrogators = {}
         
         # First, try to dynamically import and inspect
@@ -74,97 +251,92 @@ class CoverageValidator:
             discovered = registry.discover(str(self.interrogator_dir.parent))
             
             for name, interrogator_class in discovered.items():
-                methods = set()
-                # Get check types from the actual class
-                instance = interrogator_class({'region': 'us-east-1', 'account_ids': []})
-                
-                # Look for _check_* methods
-                for attr in dir(instance):
-                    if attr.startswith('_check_'):
-                        check_type = attr.replace('_check_', '')
-                        methods.add(check_type)
-                        
-                interrogators[name] = methods
+                # Look for _check_* methods on the class itself; constructing
+                # an interrogator would set up AWS clients for nothing.
+                # [7:] strips the '_check_' prefix.
+                interrogators[name] = {attr[7:] for attr in dir(interrogator_class)
+                                       if attr.startswith('_check_')}
         except:
-            # Fallback: parse files statically
-            interrogators = self._static_interrogator_discovery()
+            # Fallback: parse files statically. Only dynamic results are
+            # cached, so a later call retries the import.
+            return self._static_interrogator_discovery()
             
+        _DISCOVERY_CACHE[key] = (interrogators, self.validation_results.warnings[first_warning:])
         return interrogators
         
     def _static_interrogator_discovery(self) -> Dict[str, Set[str]]:
         """Static parsing fallback for interrogator discovery"""
         interrogators = {}
         
-        for py_file in self.interrogator_dir.glob("*.py"):
-            if py_file.name.startswith('__'):
-                continue
-                
-            class_name = None
-            check_types = set()
+        py_files = [py_file for py_file in _scan_dir(self.interrogator_dir, '.py')
+                    if not py_file.name.startswith('__')]
+        if not py_files:
+            return interrogators
             
-            try:
-                with open(py_file, 'r') as f:
-                    content = f.read()
-                    
-                # Find class name
-                import re
-                class_match = re.search(r'class\s+(\w+)\s*\(.*BaseInterrogator', content)
-                if class_match:
-                    class_name = class_match.group(1)
-                    
-                # Find check types in execute method
-                check_type_matches = re.findall(r'check_type\s*==\s*[\'"]([^\'\"]+)[\'"]', content)
-                check_types.update(check_type_matches)
+        # Read the sources on worker threads while this thread scans them
+        with ThreadPoolExecutor(max_workers=min(8, len(py_files))) as executor:
+            sources = [executor.submit(_read_bytes, py_file.path) for py_file in py_files]
+            
+            for py_file, source in zip(py_files, sources):
+                class_name = None
+                check_types = set()
                 
-                # Find _check_* methods
-                method_matches = re.findall(r'def\s+(_check_\w+)\s*\(', content)
-                for method in method_matches:
-                    check_type = method.replace('_check_', '')
-                    check_types.add(check_type)
+                try:
+                    content = source.result()
                     
-                if class_name:
-                    interrogators[class_name] = check_types
+                    for match in _DISCOVERY_RE.finditer(content):
+                        if match['cls']:
+                            # The first interrogator class in the file names it
+                            if class_name is None:
+                                class_name = match['cls'].decode('ascii')
+                        elif match['ct']:
+                            check_types.add(match['ct'].decode('utf-8'))
+                        else:
+                            check_types.add(match['mth'].decode('ascii'))
+                        
+                    if class_name:
+                        interrogators[class_name] = check_types
                     
-            except Exception as e:
-                self.validation_results['warnings'].append({
-                    'type': 'interrogator_parse_error',
-                    'file': str(py_file),
-                    'error': str(e)
-                })
+                except Exception as e:
+                    self.validation_results.warnings.append({
+                        'type': 'interrogator_parse_error',
+                        'file': py_file.path,
+                        'error': str(e)
+                    })
                 
         return interrogators
         
-    def _validate_control(self, control: Dict, available_interrogators: Dict[str, Set[str]]):
+    def _validate_control(self, control: Dict[str, Any], available_interrogators: Dict[str, FrozenSet[str]]) -> None:
         """Validate a single control"""
         control_id = control['control_id']
-        interrogation = control.get('interrogation', {})
+        interrogation = control.get('interrogation') or _EMPTY
         
         # Check required fields
         if not interrogation:
-            self.validation_results['invalid'].append({
+            self.validation_results.invalid.append({
                 'control_id': control_id,
-                'reason': 'Missing interrogation configuration',
+                'reason': _REASON_NO_INTERROGATION,
                 'severity': 'critical'
             })
             return
             
         interrogator_class = interrogation.get('class')
-        parameters = interrogation.get('parameters', {})
+        parameters = interrogation.get('parameters') or _EMPTY
         check_type = parameters.get('check_type', '')
         
         # Validate interrogator exists
         if not interrogator_class:
-            self.validation_results['invalid'].append({
+            self.validation_results.invalid.append({
                 'control_id': control_id,
-                'reason': 'No interrogator class specified',
+                'reason': _REASON_NO_CLASS,
                 'severity': 'critical'
             })
             return
             
         if interrogator_class not in available_interrogators:
-            self.validation_results['invalid'].append({
+            self.validation_results.invalid.append({
                 'control_id': control_id,
-                'reason': f'Interrogator {interrogator_class} not found',
+                'reason': _REASON_INTERROGATOR_MISSING,
                 'severity': 'critical',
                 'interrogator': interrogator_class
             })
@@ -174,9 +346,9 @@ class CoverageValidator:
         if check_type:
             available_check_types = available_interrogators[interrogator_class]
             if check_type not in available_check_types:
-                self.validation_results['invalid'].append({
+                self.validation_results.invalid.append({
                     'control_id': control_id,
-                    'reason': f'Check type "{check_type}" not found in {interrogator_class}',
+                    'reason': _REASON_CHECK_TYPE_MISSING,
                     'severity': 'high',
                     'interrogator': interrogator_class,
                     'check_type': check_type,
@@ -187,53 +359,54 @@ class CoverageValidator:
         # Validate required parameters
         validation_warnings = self._validate_parameters(control, interrogator_class, check_type)
         if validation_warnings:
-            self.validation_results['warnings'].extend(validation_warnings)
+            self.validation_results.warnings.extend(validation_warnings)
         else:
-            self.validation_results['valid'].append({
-                'control_id': control_id,
-                'interrogator': interrogator_class,
-                'check_type': check_type
-            })
+            self.validation_results.add_valid(control_id, interrogator_class, check_type)
             
-    def _validate_parameters(self, control: Dict, interrogator_class: str, 
-                           check_type: str) -> List[Dict]:
+    def _validate_parameters(self, control: Dict[str, Any], interrogator_class: str, 
+                           check_type: str) -> List[Dict[str, str]]:
         """Validate control parameters"""
-        warnings = []
-        params = control['interrogation'].get('parameters', {})
+        warnings: List[Dict[str, str]] = []
+        params = control['interrogation'].get('parameters') or _EMPTY
         
         # Check for common required parameters based on interrogator type
-        if 'Public' in interrogator_class and 'resource_type' not in params:
-            warnings.append({
-                'control_id': control['control_id'],
-                'type': 'missing_parameter',
-                'parameter': 'resource_type',
-                'severity': 'medium'
-            })
-            
-        if 'Network' in interrogator_class and check_type == 'ingress_rules':
-            if 'ports' not in params and 'port' not in control.get('metadata', {}):
-                warnings.append({
-                    'control_id': control['control_id'],
-                    'type': 'missing_parameter',
-                    'parameter': 'ports',
-                    'severity': 'low'
-                })
+        for rule in _param_rules(interrogator_class):
+            warning = rule(control, params, check_type)
+            if warning:
+                warnings.append(warning)
                 
         return warnings
         
-    def _generate_report(self, controls: List[Dict], 
+    def _generate_report(self, controls: List[Dict[str, Any]], 
                         available_interrogators: Dict[str, Set[str]]) -> Dict[str, Any]:
         """Generate comprehensive validation report"""
-        # Group invalid controls by reason
-        invalid_by_reason = defaultdict(list)
-        for invalid in self.validation_results['invalid']:
+        # Group invalid controls by reason, collect interrogators that were
+        # referenced but not found, and count interrogator usage, all in one
+        # pass over the invalid controls
+        invalid_by_reason: DefaultDict[str, List[Dict[str, Any]]] = defaultdict(list)
+        missing_interrogators: Set[str] = set()
+        usage: DefaultDict[str, int] = defaultdict(int)
+        
+        for interrogator in self.validation_results.valid_interrogators:
+            usage[interrogator] += 1
+            
+        for invalid in self.validation_results.invalid:
             reason = invalid['reason']
             invalid_by_reason[reason].append(invalid)
-            
+            if 'interrogator' in invalid:
+                usage[invalid['interrogator']] += 1
+                if reason is _REASON_INTERROGATOR_MISSING:
+                    missing_interrogators.add(invalid['interrogator'])
+                    
+        # Hand the groupings out as they are rather than copying them into
+        # plain dicts; clearing the factories makes missing keys raise again
+        invalid_by_reason.default_factory = None
+        usage.default_factory = None
+        
         # Calculate coverage statistics
         total_controls = len(controls)
-        valid_controls = len(self.validation_results['valid'])
-        invalid_controls = len(self.validation_results['invalid'])
+        valid_controls = len(self.validation_results.valid_control_ids)
+        invalid_controls = len(self.validation_results.invalid)
         coverage_percentage = (valid_controls / total_controls * 100) if total_controls > 0 else 0
         
         report = {
@@ -241,63 +414,26 @@ class CoverageValidator:
                 'total_controls': total_controls,
                 'valid_controls': valid_controls,
                 'invalid_controls': invalid_controls,
-                'warnings': len(self.validation_results['warnings']),
+                'warnings': len(self.validation_results.warnings),
                 'coverage_percentage': round(coverage_percentage, 2),
                 'available_interrogators': len(available_interrogators)
             },
-            'invalid_controls': self.validation_results['invalid'],
-            'warnings': self.validation_results['warnings'],
-            'invalid_by_reason': dict(invalid_by_reason),
-            'missing_interrogators': self._find_missing_interrogators(),
-            'interrogator_usage': self._calculate_interrogator_usage()
+            'invalid_controls': self.validation_results.invalid,
+            'warnings': self.validation_results.warnings,
+            'invalid_by_reason': invalid_by_reason,
+            'missing_interrogators': sorted(missing_interrogators),
+            'interrogator_usage': usage
         }
         
         return report
         
-    def _find_missing_interrogators(self) -> List[str]:
-        """Find interrogators referenced but not available"""
-        referenced = set()
-        
-        for invalid in self.validation_results['invalid']:
-            if 'interrogator' in invalid and 'not found' in invalid['reason']:
-                referenced.add(invalid['interrogator'])
-                
-        return sorted(list(referenced))
-        
-    def _calculate_interrogator_usage(self) -> Dict[str, int]:
-        """Calculate how many controls use each interrogator"""
-        usage = defaultdict(int)
-        
-        for valid in self.validation_results['valid']:
-            usage[valid['interrogator']] += 1
-            
-        for invalid in self.validation_results['invalid']:
-            if 'interrogator' in invalid:
-                usage[invalid['interrogator']] += 1
-                
-        return dict(usage)
-        
     def generate_fix_script(self, report: Dict[str, Any], output_file: str):
         """Generate a script to fix common issues"""
-        fixes = []
-        
-        # Group fixes by type
-        for invalid in report['invalid_controls']:
-            control_id = invalid['control_id']
-            reason = invalid['reason']
-            
-            if 'not found' in reason and 'Interrogator' in reason:
-                fixes.append(f"# Control {control_id} needs interrogator: {invalid.get('interrogator', 'Unknown')}")
-                fixes.append(f"# Consider mapping to an existing interrogator or creating a new one\n")
-            elif 'Check type' in reason:
-                fixes.append(f"# Control {control_id} needs method '{invalid['check_type']}' in {invalid['interrogator']}")
-                fixes.append(f"# Available methods: {', '.join(invalid.get('available_check_types', []))}\n")
-                
-        # Write fix script
+        # Stream the suggestions to the file instead of joining them first
         with open(output_file, 'w') as f:
             f.write("#!/usr/bin/env python3\n")
             f.write("# Auto-generated fix suggestions\n\n")
-            f.write("\n".join(fixes))
+            f.writelines(_iter_fixes(report['invalid_controls']))
             
         print(f"Generated fix suggestions in {output_file}")
 
@@ -312,8 +448,7 @@ if __name__ == "__main__":
     report = validator.validate_coverage()
     
     # Save report
-    with open('coverage_report.json', 'w') as f:
-        json.dump(report, f, indent=2)
+    write_json('coverage_report.json', report)
         
     print(f"Coverage Validation Report:")
     print(f"- Total controls: {report['summary']['total_controls']}")
@@ -5,16 +5,12 @@ Main execution script for the control framework
 
 import argparse
 import logging
-import json
 import sys
 from datetime import datetime
-from pathlib import Path
-
-# Add framework to path
-sys.path.append(str(Path(__file__).parent))
 
 from framework.execution_engine import ExecutionEngine
 from framework.report_generator import ReportGenerator
+from mapping_engine.json_io import write_json
 
 # Configure logging
 logging.basicConfig(
@@ -59,8 +55,7 @@ def main():
         if args.format == 'console':
             print_console_report(results)
         elif args.format == 'json':
-            with open(args.output, 'w') as f:
-                json.dump(results, f, indent=2, default=str)
+            write_json(args.output, results, default=str)
             logger.info(f"JSON report saved to {args.output}")
         elif args.format == 'html':
             generator = ReportGenerator()
@@ -101,23 +96,33 @@ def print_console_report(results: dict):
                     print(f"\n  Control: {control['control_id']} - {control['title']}")
                     print(f"  Severity: {control['severity']}")
                     
-                    # Group violations by type
-                    historical = [v for v in violations if v.get('timestamp')]
-                    current = [v for v in violations if not v.get('timestamp')]
-                    
+                    # Group violations by type in one pass, keeping only
+                    # the first 5 of each and counting the rest
+                    historical, current = [], []
+                    historical_count = current_count = 0
+                    for v in violations:
+                        if v.get('timestamp'):
+                            if historical_count < 5:
+                                historical.append(v)
+                            historical_count += 1
+                        else:
+                            if current_count < 5:
+                                current.append(v)
+                            current_count += 1
+                            
                     if historical:
                         print(f"\n    CLOUDTRAIL (Past 30 days):")
-                        for v in historical[:5]:  # Show first 5
+                        for v in historical:
                             print(f"    ✗ {v['offender']} - {v['action']}")
-                        if len(historical) > 5:
-                            print(f"    ... and {len(historical) - 5} more")
+                        if historical_count > 5:
+                            print(f"    ... and {historical_count - 5} more")
                             
                     if current:
                         print(f"\n    CURRENT STATE:")
-                        for v in current[:5]:  # Show first 5
+                        for v in current:
                             print(f"    ✗ {v['resource']}")
-                        if len(current) > 5:
-                            print(f"    ... and {len(current) - 5} more")
+                        if current_count > 5:
+                            print(f"    ... and {current_count - 5} more")
     
     print("\n" + "="*60)
 
@@ -6,9 +6,6 @@ Test script to verify framework setup
 import sys
 from pathlib import Path
 
-# Add framework to path
-sys.path.append(str(Path(__file__).parent))
-
 def test_imports():
     """Test that all modules can be imported"""
     print("Testing imports...")
@@ -74,6 +71,9 @@ def test_interrogator_discovery():
 
 
 if __name__ == '__main__':
+    # Add framework to path
+    sys.path.append(str(Path(__file__).parent))
+    
     print("AWS Security Control Framework - Setup Test")
     print("="*50)
     